@@ -0,0 +1,162 @@
+"""Generate synthetic HLAPI device modules and sphinx projects
+for benchmarking the devicedoc extension."""
+
+# Imports
+import os
+import sys
+
+# Paths
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Templates
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do "
+         "eiusmod tempor incididunt ut labore et dolore magna aliqua").split()
+
+HEADER = '''\
+"""Synthetic device module {index}."""
+
+from PyTango import AttrWriteType, DispLevel
+from PyTango.server import Device, DeviceMeta, attribute, command
+from PyTango.server import device_property, class_property
+'''
+
+DEVICE = '''
+
+class {name}(Device):
+    """{doc}"""
+    __metaclass__ = DeviceMeta
+'''
+
+PROPERTIES = '''
+    class_prop{index} = class_property(dtype=int, default_value={index})
+
+    #: {doc}
+    prop{index} = device_property(dtype=str, doc="{doc}")
+'''
+
+ATTRIBUTE = '''
+    attr{index} = attribute(label="Attribute {index}", dtype=float,
+                            display_level=DispLevel.EXPERT,
+                            access=AttrWriteType.READ_WRITE,
+                            unit="A", format="8.4f",
+                            min_value=0.0, max_value={index}.5,
+                            doc="{doc}")
+
+    def read_attr{index}(self):
+        return {index}.0
+'''
+
+COMMAND = '''
+    @command(dtype_in=float, dtype_out=float)
+    def cmd{index}(self, value):
+        """{doc}"""
+        return value
+'''
+
+CONF = '''\
+import os
+import sys
+sys.path.insert(0, {root!r})
+sys.path.insert(0, os.path.abspath('.'))
+
+extensions = ['sphinx.ext.autodoc', 'devicedoc']
+master_doc = 'index'
+project = u'devicedoc-benchmark'
+devicedoc_pytango_stub = True
+'''
+
+
+# Generators
+def make_doc(size):
+    """Generate a docstring of the given number of words."""
+    words = [WORDS[i % len(WORDS)] for i in range(max(size, 1))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def module_name(index):
+    """Return the name of a synthetic module."""
+    return 'benchdevices{0}'.format(index)
+
+
+def device_name(module, index):
+    """Return the name of a synthetic device class."""
+    return 'BenchDevice{0}x{1}'.format(module, index)
+
+
+def generate_module(index, devices, attributes, commands,
+                    properties, docsize):
+    """Generate the source of a synthetic device module."""
+    doc = make_doc(docsize)
+    lines = [HEADER.format(index=index)]
+    for device in range(devices):
+        lines.append(DEVICE.format(name=device_name(index, device), doc=doc))
+        for item in range(properties):
+            lines.append(PROPERTIES.format(index=item, doc=doc))
+        for item in range(attributes):
+            lines.append(ATTRIBUTE.format(index=item, doc=doc))
+        for item in range(commands):
+            lines.append(COMMAND.format(index=item, doc=doc))
+    return ''.join(lines)
+
+
+def generate_page(mode, index, devices, attributes, commands, properties):
+    """Generate the document of a synthetic module for the given mode.
+
+    - 'device': one automodule directive (full class path).
+    - 'item': one autotangoitem directive per tango item.
+    """
+    modname = module_name(index)
+    names = [device_name(index, device) for device in range(devices)]
+    lines = [modname, '=' * len(modname), '']
+    if mode == 'device':
+        lines.append('.. automodule:: {0}'.format(modname))
+        lines.append('    :members: {0}'.format(', '.join(names)))
+        lines.append('')
+        return '\n'.join(lines)
+    items = ['class_prop{0}'.format(i) for i in range(properties)]
+    items += ['prop{0}'.format(i) for i in range(properties)]
+    items += ['attr{0}'.format(i) for i in range(attributes)]
+    items += ['cmd{0}'.format(i) for i in range(commands)]
+    for name in names:
+        for item in items:
+            lines.append('.. autotangoitem:: {0}.{1}.{2}'.format(
+                modname, name, item))
+            lines.append('')
+    return '\n'.join(lines)
+
+
+def generate_index(modules):
+    """Generate the index document, with one page per module so an
+    incremental build only re-reads the pages of the changed modules."""
+    lines = ['Benchmark', '=========', '', '.. toctree::', '']
+    lines += ['    {0}'.format(module_name(index))
+              for index in range(modules)]
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def generate_project(directory, mode='device', modules=10, devices=1,
+                     attributes=20, commands=10, properties=5, docsize=20):
+    """Generate a sphinx project documenting synthetic device modules."""
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for index in range(modules):
+        source = generate_module(index, devices, attributes, commands,
+                                 properties, docsize)
+        path = os.path.join(directory, module_name(index) + '.py')
+        with open(path, 'w') as module:
+            module.write(source)
+        path = os.path.join(directory, module_name(index) + '.rst')
+        with open(path, 'w') as page:
+            page.write(generate_page(mode, index, devices, attributes,
+                                     commands, properties))
+    with open(os.path.join(directory, 'conf.py'), 'w') as conf:
+        conf.write(CONF.format(root=ROOT))
+    with open(os.path.join(directory, 'index.rst'), 'w') as index:
+        index.write(generate_index(modules))
+    return directory
+
+
+# Main
+if __name__ == '__main__':
+    generate_project(*sys.argv[1:2])
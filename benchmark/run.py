@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""Benchmark the devicedoc extension on synthetic device servers.
+
+For each documentation mode, a sphinx project is generated and built
+twice: a full build, then an incremental build after changing an
+attribute of a single device module. The wall time and the peak memory
+of each sphinx-build process are reported as JSON.
+"""
+
+# Imports
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from generate import generate_project, module_name
+
+# Modes
+MODES = ['device', 'item']
+
+
+# Build helpers
+def run_build(directory, options):
+    """Run sphinx-build in a subprocess and measure it."""
+    command = ['sphinx-build', '-q'] + options + \
+              [directory, os.path.join(directory, '_build')]
+    start = time.time()
+    process = subprocess.Popen(command)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.WEXITSTATUS(status)
+    return {'time': time.time() - start,
+            'peak_rss_kb': usage.ru_maxrss,
+            'status': process.returncode}
+
+
+def edit_module(directory, index=0):
+    """Change the label of the first attribute of a device module,
+    so the interface fingerprint of its devices changes."""
+    path = os.path.join(directory, module_name(index) + '.py')
+    with open(path) as module:
+        source = module.read()
+    source = source.replace('label="Attribute 0"',
+                            'label="Attribute 0 (edited)"')
+    stamp = os.path.getmtime(path) + 1
+    with open(path, 'w') as module:
+        module.write(source)
+    os.utime(path, (stamp, stamp))
+
+
+def run_mode(mode, args):
+    """Generate and build the project of a given mode."""
+    directory = tempfile.mkdtemp(prefix='devicedoc-bench-')
+    try:
+        generate_project(directory, mode, args.modules, args.devices,
+                         args.attributes, args.commands, args.properties,
+                         args.doc_size)
+        options = ['-j', str(args.jobs)] if args.jobs > 1 else []
+        for define in args.define:
+            options += ['-D', define]
+        results = []
+        full = run_build(directory, ['-E'] + options)
+        full.update(mode=mode, build='full')
+        results.append(full)
+        edit_module(directory)
+        incremental = run_build(directory, options)
+        incremental.update(mode=mode, build='incremental')
+        results.append(incremental)
+        return results
+    finally:
+        if args.keep:
+            sys.stderr.write('Project kept in {0}\n'.format(directory))
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# Main
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', type=int, default=10,
+                        help='number of device modules')
+    parser.add_argument('--devices', type=int, default=1,
+                        help='number of device classes per module')
+    parser.add_argument('--attributes', type=int, default=20,
+                        help='number of attributes per device')
+    parser.add_argument('--commands', type=int, default=10,
+                        help='number of commands per device')
+    parser.add_argument('--properties', type=int, default=5,
+                        help='number of device and class properties '
+                             'per device')
+    parser.add_argument('--doc-size', type=int, default=20,
+                        help='number of words per docstring')
+    parser.add_argument('--mode', choices=MODES, action='append',
+                        help='documentation mode (default: all)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of parallel sphinx processes')
+    parser.add_argument('--define', '-D', action='append', default=[],
+                        help='override a configuration value '
+                             '(e.g. devicedoc_loader=static)')
+    parser.add_argument('--output', '-o',
+                        help='JSON report file (default: stdout)')
+    parser.add_argument('--keep', action='store_true',
+                        help='keep the generated projects')
+    args = parser.parse_args(argv)
+    report = {'parameters': dict(vars(args), mode=args.mode or MODES),
+              'results': []}
+    for mode in args.mode or MODES:
+        report['results'].extend(run_mode(mode, args))
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as reportfile:
+            reportfile.write(output + '\n')
+    else:
+        print(output)
+    return int(any(result['status'] for result in report['results']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""Demo power supply with a stabilized output."""
+
+from PyTango.server import attribute
+
+from powersupply import PowerSupply
+
+
+class StablePowerSupply(PowerSupply):
+    """Power supply regulating its output voltage."""
+
+    ripple = attribute(label="Ripple", dtype=float, unit="mV")
+
+    def read_ripple(self):
+        return 0.1
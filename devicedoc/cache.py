@@ -0,0 +1,65 @@
+"""Persistent cache of the device interfaces, shared across builds.
+
+Each device module gets a JSON file containing the interfaces of its
+device classes, along with a key computed from the module source,
+the devicedoc version and the loader used to extract them.
+"""
+
+# Imports
+import os
+import json
+import hashlib
+from . import __version__
+from .interface import TangoInterface
+
+
+# Cache key
+def get_cache_key(filename, loader):
+    """Compute the cache key of a module from its source file."""
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as source:
+        digest.update(source.read())
+    digest.update(__version__.encode('ascii'))
+    digest.update(loader.encode('ascii'))
+    return digest.hexdigest()
+
+
+# Interface cache
+class InterfaceCache(object):
+    """On-disk cache of the device interfaces."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_path(self, modname):
+        """Return the cache file of a module."""
+        return os.path.join(self.directory, modname + '.json')
+
+    def load(self, modname, key):
+        """Return the cached interfaces of a module,
+        or None if they're missing or outdated."""
+        try:
+            with open(self.get_path(modname)) as cachefile:
+                data = json.load(cachefile)
+        except (IOError, OSError, ValueError):
+            return None
+        if data.get('key') != key:
+            return None
+        return dict((name, TangoInterface.from_dict(interface))
+                    for name, interface in data['interfaces'].items())
+
+    def save(self, modname, key, interfaces):
+        """Store the interfaces of a module."""
+        data = {'key': key,
+                'interfaces': dict((name, interface.to_dict())
+                                   for name, interface in interfaces.items())}
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                pass
+        path = self.get_path(modname)
+        temp = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(temp, 'w') as cachefile:
+            json.dump(data, cachefile)
+        os.rename(temp, path)
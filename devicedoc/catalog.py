@@ -0,0 +1,68 @@
+"""Machine-readable catalog of the documented device interfaces.
+
+The catalog is written in the JSON Lines format: one line per device
+class, containing its interface, its fingerprint and the documents it
+appears in. The lines are streamed one device at a time. The catalogs of
+two builds can be compared to list the devices whose interface changed.
+"""
+
+# Imports
+import json
+from .interface import TangoInterface, diff_interfaces
+
+
+# Catalog entries
+def make_entry(interface):
+    """Return the catalog entry of an interface."""
+    entry = interface.to_dict()
+    entry['fingerprint'] = interface.fingerprint()
+    return entry
+
+
+def iter_catalog(documents, index):
+    """Generate the catalog entries from the documented devices
+    of each document and the interface index."""
+    docnames = {}
+    for docname, devices in documents.items():
+        for key in devices:
+            docnames.setdefault(key, []).append(docname)
+    for modname, name in sorted(docnames):
+        if modname not in index or name not in index[modname][-1]:
+            continue
+        entry = make_entry(index[modname][-1][name])
+        entry['docnames'] = sorted(docnames[modname, name])
+        yield entry
+
+
+# Catalog writer
+def dump_catalog(stream, entries):
+    """Write the catalog entries to a stream, one JSON object per line."""
+    count = 0
+    for entry in entries:
+        stream.write(json.dumps(entry, sort_keys=True) + '\n')
+        count += 1
+    return count
+
+
+def write_catalog(filename, entries):
+    """Write the catalog entries to a file."""
+    with open(filename, 'w') as catalog:
+        return dump_catalog(catalog, entries)
+
+
+# Catalog comparison
+def load_catalog(filename):
+    """Return the interfaces of a catalog, keyed by (module, name)."""
+    interfaces = {}
+    with open(filename) as catalog:
+        for line in catalog:
+            if line.strip():
+                interface = TangoInterface.from_dict(json.loads(line))
+                interfaces[interface.module, interface.name] = interface
+    return interfaces
+
+
+def diff_catalogs(old, new):
+    """Return the device changes between two catalog files,
+    e.g. written by two successive builds."""
+    return diff_interfaces(load_catalog(old), load_catalog(new))
@@ -0,0 +1,163 @@
+"""Command-line extractor of HLAPI device interfaces.
+
+The interfaces of the device classes are extracted from a list of
+modules, packages or directories, in a pool of worker processes,
+and written as reST, JSON or JSON Lines. The extraction can be split
+into shards, merged afterwards with devicedoc-merge.
+"""
+
+# Imports
+import os
+import sys
+import json
+import argparse
+from .static import find_modules, scan_module
+from .workers import ExtractionPool
+from .catalog import make_entry, dump_catalog
+from .interface import TangoInterface, render_interface
+from .shard import SHARD_KEYS, parse_shard, select_modules, select_interfaces
+
+
+# Targets
+def add_path(directory):
+    """Add a directory to the python path, if needed."""
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+
+def find_candidates(modules):
+    """Return the names of the (modname, filename) modules whose source
+    may declare device classes, so the other modules are not imported."""
+    return [modname for modname, filename in modules if scan_module(filename)]
+
+
+def find_package_modules(directory):
+    """Return the names of the device modules of a package directory,
+    named from the first parent directory that is not a package. This
+    directory is added to the python path."""
+    directory, parts = os.path.abspath(directory), []
+    while os.path.isfile(os.path.join(directory, '__init__.py')):
+        directory, name = os.path.split(directory)
+        parts.insert(0, name)
+    add_path(directory)
+    return find_candidates(find_modules('.'.join(parts)))
+
+
+def find_directory_modules(directory):
+    """Return the names of the device modules and packages of a directory
+    tree. Each directory that is not a package is added to the python path,
+    so its modules and packages are named from it."""
+    directory = os.path.abspath(directory)
+    add_path(directory)
+    modules, subdirectories = [], []
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        base, ext = os.path.splitext(filename)
+        if ext == '.py':
+            modules.append((base, path))
+        elif os.path.isfile(os.path.join(path, '__init__.py')):
+            modules.extend(find_modules(filename))
+        elif os.path.isdir(path) and not filename.startswith(('.', '_')):
+            subdirectories.append(path)
+    modnames = find_candidates(modules)
+    for path in subdirectories:
+        modnames.extend(find_directory_modules(path))
+    return modnames
+
+
+def find_targets(targets):
+    """Return the module names corresponding to the targets."""
+    modnames = []
+    for target in targets:
+        if os.path.isfile(os.path.join(target, '__init__.py')):
+            modnames.extend(find_package_modules(target))
+        elif os.path.isdir(target):
+            modnames.extend(find_directory_modules(target))
+        else:
+            modnames.extend(name for name, _ in find_modules(target))
+    return modnames
+
+
+# Output
+def write_rst(stream, interfaces):
+    """Write the reST documentation of the interfaces."""
+    for interface in interfaces:
+        for line in render_interface(interface):
+            stream.write(line + '\n')
+
+
+def write_json(stream, interfaces):
+    """Write the interfaces as a JSON list."""
+    data = [interface.to_dict() for interface in interfaces]
+    json.dump(data, stream, indent=2, sort_keys=True)
+    stream.write('\n')
+
+
+def write_jsonl(stream, interfaces):
+    """Write the interfaces as JSON Lines, as read by devicedoc-merge."""
+    dump_catalog(stream, (make_entry(interface) for interface in interfaces))
+
+
+WRITERS = {'rst': write_rst, 'json': write_json, 'jsonl': write_jsonl}
+
+
+# Main
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='devicedoc', description=__doc__.splitlines()[0])
+    parser.add_argument('targets', nargs='+', metavar='target',
+                        help='module, package or directory')
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                        default='rst', help='output format (default: rst)')
+    parser.add_argument('-o', '--output',
+                        help='output file (default: stdout)')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='number of worker processes '
+                             '(default: number of CPUs)')
+    parser.add_argument('-t', '--timeout', type=float, default=60.,
+                        help='timeout per module in seconds (default: 60)')
+    parser.add_argument('--loader', choices=['import', 'static', 'isolated'],
+                        default='import',
+                        help='how the device modules are loaded '
+                             '(default: import)')
+    parser.add_argument('--stub', action='store_true',
+                        help='use the PyTango stub instead of PyTango')
+    parser.add_argument('--shard', metavar='index/count',
+                        help='only extract the given shard, e.g. 1/4')
+    parser.add_argument('--shard-by', choices=SHARD_KEYS, default='module',
+                        help='partition the shards by module or by device '
+                             'class (default: module)')
+    args = parser.parse_args(argv)
+    sys.path.insert(0, os.getcwd())
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+        modnames = find_targets(args.targets)
+    except (ValueError, ImportError) as exc:
+        parser.error(str(exc))
+    if shard:
+        modnames = select_modules(modnames, shard, args.shard_by)
+    # Extract
+    interfaces, failed = [], 0
+    with ExtractionPool(args.jobs, args.stub, args.loader,
+                        args.timeout) as pool:
+        for modname, data, error in pool.extract(modnames):
+            if error:
+                failed += 1
+                sys.stderr.write('devicedoc: failed to extract {0}:\n{1}\n'
+                                 .format(modname, error))
+                continue
+            interfaces.extend(TangoInterface.from_dict(data[name])
+                              for name in sorted(data))
+    if shard:
+        interfaces = select_interfaces(interfaces, shard, args.shard_by)
+    # Write
+    if args.output:
+        with open(args.output, 'w') as stream:
+            WRITERS[args.format](stream, interfaces)
+    else:
+        WRITERS[args.format](sys.stdout, interfaces)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
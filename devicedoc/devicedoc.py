@@ -2,108 +2,250 @@
 from a HLAPI Tango Device class."""
 
 # Imports
-from importlib import import_module
-from sphinx.util import force_decode
+import os
+import json
+from types import ModuleType
+from docutils import nodes
+from docutils.statemachine import ViewList
+from docutils.parsers.rst import Directive
+from sphinx.util.nodes import nested_parse_with_titles
 from sphinx.application import Sphinx
 from sphinx.ext.autodoc import ClassDocumenter, AttributeDocumenter
-from sphinx.ext.autodoc import ClassLevelDocumenter
-from collections import defaultdict
-
-
-# Mock
-class BaseMock(object):
-    """Mocking base class."""
-
-    def __init__(self, func=None, **kwargs):
-        """Save kwargs and function documentation."""
-        self.kwargs = kwargs
-        self.func_doc = func.__doc__ if func else None
-
-    def __call__(self, func):
-        """Decorator support."""
-        self.func_doc = func.__doc__
-        return self
-
-    def setter(self, func):
-        """Decorator support."""
-        return self
-
-    def deleter(self, func):
-        """Decorator support."""
-        return self
-
-    def __repr__(self):
-        """Generate a readable representation."""
-        args = []
-        # Add type
-        name = type(self).__name__.replace('_', ' ')
-        base = "{}:\n".format(name.capitalize())
-        # Add kwargs
-        for key, value in sorted(self.kwargs.items()):
-            if key in ["doc", "fget", "fset", "fisallowed"]:
-                continue
-            if value == "":
-                value = "None"
-            try:
-                value = value.__name__
-            except AttributeError:
-                pass
-            args.append("    - {0} : {1}".format(key, value))
-        if not args:
-            return base[:-2] + '.'
-        return base + '\n'.join(args)
-
-    def get_doc(self, encoding=None):
-        """Get the documentation from the object."""
-        doc = self.func_doc or self.kwargs.get('doc') or ''
-        return force_decode(doc, encoding)
-
-
-# Tango mock
-
-class class_property(BaseMock):
-    """Mock for class property."""
-    pass
-
+from sphinx.ext.autodoc import ClassLevelDocumenter, bool_option, ALL
+from sphinx.pycode import ModuleAnalyzer, PycodeError
+from . import __version__
+from .stats import STATISTICS, PROFILER, timed, profiled
+from .domain import TangoDomain
+from .loader import get_source_file, get_mtime, find_source_file
+from .loader import reload_module, reset_reload_cache, load_device_module
+from .mock import BaseMock, Device, DeviceMeta, pytango_patch, force_decode
+from .mock import class_property, device_property, attribute, command
 
-class device_property(BaseMock):
-    """Mock for device property."""
-
-
-class attribute(BaseMock):
-    """Mock for TANGO attribute."""
-    def write(self, method):
-        pass
 
+# Monkey patching
+def install_mocks(app):
+    """Install the PyTango stub or patch the PyTango server module."""
+    if app.config.devicedoc_pytango_stub:
+        from .stub import install_stub
+        install_stub()
+    else:
+        pytango_patch()
 
-class command(BaseMock):
-    """Mock for TANGO command."""
-    __tango_command__ = True
-    __name__ = "tango_command"
 
+# Environment data
+ENV_DATA = ['devicedoc_modules', 'devicedoc_sections', 'devicedoc_devices',
+            'devicedoc_fingerprints']
 
-class DeviceMeta(type):
-    """Mock for device metaclass."""
-    pass
 
+def get_env_data(env, name):
+    """Get a devicedoc dictionary stored in the build environment."""
+    if not hasattr(env, name):
+        setattr(env, name, {})
+    return getattr(env, name)
 
-class Device(object):
-    """Mock for device class."""
-    __metaclass__ = DeviceMeta
 
-    def run_server(self, cls):
-        pass
+def note_module(env, modname, filename):
+    """Register the source file of a module as a dependency
+    of the document being read."""
+    if not filename:
+        return
+    modules = get_env_data(env, 'devicedoc_modules')
+    modules.setdefault(env.docname, {})[modname] = filename
+    env.note_dependency(filename)
+
+
+def note_device(env, interface):
+    """Register a device class as documented in the current document,
+    along with the fingerprint of its interface."""
+    key = interface.module, interface.name
+    devices = get_env_data(env, 'devicedoc_devices')
+    devices.setdefault(env.docname, set()).add(key)
+    fingerprints = get_env_data(env, 'devicedoc_fingerprints')
+    fingerprints.setdefault(env.docname, {})[key] = interface.fingerprint()
+
+
+def note_changes(env, changes):
+    """Register the device changes found during the current build."""
+    if not hasattr(env, 'devicedoc_changes'):
+        env.devicedoc_changes = []
+    env.devicedoc_changes.extend(change for change in changes
+                                 if change not in env.devicedoc_changes)
+
+
+def start_device(env):
+    """Enable the automatic section headers in the current document."""
+    get_env_data(env, 'devicedoc_sections')[env.docname] = set()
+
+
+def start_section(env, name):
+    """Return True if a section header has to be added
+    to the current document."""
+    sections = get_env_data(env, 'devicedoc_sections').get(env.docname)
+    if sections is None or name in sections:
+        return False
+    sections.add(name)
+    return True
+
+
+def purge_doc(app, env, docname):
+    """Remove the devicedoc data about a document."""
+    for name in ENV_DATA:
+        get_env_data(env, name).pop(docname, None)
+
+
+def merge_info(app, env, docnames, other):
+    """Merge the devicedoc data from a parallel reading process."""
+    for name in ENV_DATA:
+        data, other_data = get_env_data(env, name), get_env_data(other, name)
+        for docname in docnames:
+            if docname in other_data:
+                data[docname] = other_data[docname]
+    interfaces = get_env_data(env, 'devicedoc_interfaces')
+    interfaces.update(get_env_data(other, 'devicedoc_interfaces'))
+    note_changes(env, getattr(other, 'devicedoc_changes', ()))
+    statistics = getattr(other, 'devicedoc_statistics', None)
+    if statistics is not None and statistics is not STATISTICS:
+        STATISTICS.merge(statistics)
+    profiler = getattr(other, 'devicedoc_profiler', None)
+    if profiler is not None and profiler is not PROFILER:
+        PROFILER.merge(profiler)
+
+
+def has_changed_modules(env, docname):
+    """Check whether a module loaded by a document changed
+    since the document was read."""
+    mtime = env.all_docs.get(docname, 0)
+    modules = get_env_data(env, 'devicedoc_modules')
+    for filename in modules.get(docname, {}).values():
+        try:
+            if os.path.getmtime(filename) > mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def has_changed_interfaces(env, docname):
+    """Check whether the interface of a device documented in a document
+    changed since the document was read."""
+    fingerprints = get_env_data(env, 'devicedoc_fingerprints')
+    for (modname, name), fingerprint in fingerprints.get(docname,
+                                                         {}).items():
+        try:
+            _, interfaces = load_interfaces(env, modname)
+        except Exception:
+            return True
+        interface = interfaces.get(name)
+        if interface is None or interface.fingerprint() != fingerprint:
+            return True
+    return False
+
+
+def get_outdated(app, env, added, changed, removed):
+    """Return the documents whose device modules changed since they were
+    last read, or whose device interfaces have a different fingerprint."""
+    # Sphinx 1.8 passes the builder instead of the environment
+    env = app.env
+    outdated = []
+    fingerprints = get_env_data(env, 'devicedoc_fingerprints')
+    prefetch_process_modules(env, sorted(set(
+        modname for devices in fingerprints.values()
+        for modname, _ in devices)))
+    docnames = set(get_env_data(env, 'devicedoc_modules'))
+    docnames.update(fingerprints)
+    for docname in sorted(docnames):
+        if docname in added or docname in changed or docname in removed:
+            continue
+        if has_changed_modules(env, docname) or \
+           has_changed_interfaces(env, docname):
+            outdated.append(docname)
+    return outdated
+
+
+# Changes
+def init_changes(app):
+    """Forget about the device changes of the previous build."""
+    app.env.devicedoc_changes = []
+
+
+def report_changes(app, exception):
+    """Emit the device changes found during the build
+    and write them as JSON."""
+    from .interface import format_change
+    if exception is not None:
+        return
+    changes = getattr(app.env, 'devicedoc_changes', [])
+    for change in changes:
+        app.info('devicedoc: ' + format_change(change))
+    if app.config.devicedoc_changes_file:
+        filename = os.path.join(app.outdir, app.config.devicedoc_changes_file)
+        with open(filename, 'w') as report:
+            json.dump(changes, report, indent=2, sort_keys=True)
+
+
+# Statistics
+def init_statistics(app):
+    """Enable and reset the statistics for a new build."""
+    STATISTICS.enabled = app.config.devicedoc_stats
+    STATISTICS.reset()
+    app.env.devicedoc_statistics = STATISTICS
+
+
+def report_statistics(app, exception):
+    """Emit the statistics summary and write the JSON report."""
+    if not STATISTICS.enabled or exception is not None:
+        return
+    STATISTICS.update_peak_rss()
+    for line in STATISTICS.summary():
+        app.info(line)
+    if app.config.devicedoc_stats_file:
+        STATISTICS.write(os.path.join(app.outdir,
+                                      app.config.devicedoc_stats_file))
+
+
+# Profiling
+def init_profiler(app):
+    """Enable and reset the profiler for a new build."""
+    PROFILER.enabled = app.config.devicedoc_profile
+    PROFILER.reset()
+    app.env.devicedoc_profiler = PROFILER
+    if not PROFILER.enabled:
+        return
+    memory = PROFILER.start()
+    if memory is None:
+        app.warn('devicedoc: the memory cannot be measured, '
+                 'only the time is profiled')
+    elif memory == 'rss':
+        app.info('devicedoc: tracemalloc.reset_peak is not available, '
+                 'profiling the growth of the peak resident memory')
+
+
+def report_profile(app, exception):
+    """Emit the profile summary and write the JSON report."""
+    if not PROFILER.enabled:
+        return
+    PROFILER.stop()
+    if exception is not None:
+        return
+    for line in PROFILER.summary():
+        app.info(line)
+    if app.config.devicedoc_profile_file:
+        PROFILER.write(os.path.join(app.outdir,
+                                    app.config.devicedoc_profile_file))
 
 
-# Monkey patching
-def pytango_patch():
-    from PyTango import server
-    server.attribute = attribute
-    server.command = command
-    server.device_property = device_property
-    server.class_property = class_property
-    server.Device = Device
-    server.DeviceMeta = DeviceMeta
+# Catalog
+def write_catalog(app, exception):
+    """Write the catalog of the documented device interfaces."""
+    if exception is not None or not app.config.devicedoc_catalog:
+        return
+    from . import catalog
+    entries = catalog.iter_catalog(
+        get_env_data(app.env, 'devicedoc_devices'),
+        get_env_data(app.env, 'devicedoc_interfaces'))
+    filename = os.path.join(app.outdir, app.config.devicedoc_catalog)
+    count = catalog.write_catalog(filename, entries)
+    app.info('devicedoc: {0} devices written to {1}'.format(count, filename))
 
 
 # Reload object
@@ -112,37 +254,414 @@ def reload_object(obj):
     if not isinstance(obj, type):
         return obj
     try:
-        module = reload(import_module(obj.__module__))
+        module = reload_module(obj.__module__)
         return getattr(module, obj.__name__)
     except:
         return obj
 
 
+# Module loading
+def seed_analyzer(modname, filename):
+    """Let the module analyzer use a source file
+    instead of importing the module."""
+    key = 'module', modname
+    if key in ModuleAnalyzer.cache:
+        return
+    try:
+        ModuleAnalyzer.cache[key] = ModuleAnalyzer.for_file(filename, modname)
+    except PycodeError:
+        pass
+
+
+def get_attr_docs(modname, filename):
+    """Return the documentation comments of a module source, keyed by
+    (class name, attribute name). The fresh analyzer replaces the cached
+    one, so the documenters render the same comments."""
+    try:
+        with open(filename, 'rb') as source:
+            analyzer = ModuleAnalyzer.for_string(
+                source.read(), modname, filename)
+        attr_docs = analyzer.find_attr_docs()
+    except (IOError, PycodeError):
+        return {}
+    ModuleAnalyzer.cache['module', modname] = analyzer
+    return dict((key, [force_decode(line, analyzer.encoding)
+                       for line in lines])
+                for key, lines in attr_docs.items())
+
+
+def note_comments(modname, filename, interfaces):
+    """Store the documentation comments of the items in their interface,
+    so editing a comment changes the interface fingerprint."""
+    if not filename or not filename.endswith('.py'):
+        return
+    attr_docs = get_attr_docs(modname, filename)
+    for interface in interfaces.values():
+        interface.comments = dict(
+            (item.name, attr_docs[interface.name, item.name])
+            for item in interface.items
+            if (interface.name, item.name) in attr_docs)
+
+
+def load_module(env, modname):
+    """Load a device module using the configured loader."""
+    loader = env.config.devicedoc_loader
+    if loader == 'process':
+        return load_process_module(modname)
+    return load_device_module(modname, loader)
+
+
+# Process loader
+PROCESS_POOLS = {}
+PROCESS_OPTIONS = {}
+PROCESS_RESULTS = {}
+
+
+def init_process_pool(app):
+    """Configure the worker processes of the process loader."""
+    close_process_pool()
+    PROCESS_OPTIONS.update(workers=app.config.devicedoc_workers,
+                           stub=app.config.devicedoc_pytango_stub,
+                           timeout=app.config.devicedoc_timeout)
+
+
+def get_process_pool():
+    """Return the extraction pool of the current process,
+    starting it if needed."""
+    pid = os.getpid()
+    if pid not in PROCESS_POOLS:
+        from .workers import ExtractionPool
+        PROCESS_POOLS[pid] = ExtractionPool(
+            PROCESS_OPTIONS.get('workers'), PROCESS_OPTIONS.get('stub'),
+            'import', PROCESS_OPTIONS.get('timeout'))
+    return PROCESS_POOLS[pid]
+
+
+def close_process_pool(app=None, exception=None):
+    """Terminate the worker processes started by the current process."""
+    pool = PROCESS_POOLS.pop(os.getpid(), None)
+    if pool is not None:
+        pool.close()
+    PROCESS_RESULTS.clear()
+
+
+def extract_process_modules(modnames):
+    """Extract the interfaces of the given modules concurrently
+    in the worker processes. The results are kept for the build."""
+    from .interface import TangoInterface
+    modnames = [modname for modname in modnames
+                if modname not in PROCESS_RESULTS]
+    if not modnames:
+        return
+    for modname, data, error in get_process_pool().extract(modnames):
+        STATISTICS.count('modules extracted in workers')
+        if error:
+            PROCESS_RESULTS[modname] = None, error
+            continue
+        PROCESS_RESULTS[modname] = dict(
+            (name, TangoInterface.from_dict(interface))
+            for name, interface in data.items()), None
+
+
+def load_process_interfaces(modname):
+    """Return the interfaces of a module extracted in a worker process."""
+    extract_process_modules([modname])
+    interfaces, error = PROCESS_RESULTS[modname]
+    if error:
+        msg = 'failed to extract {0} in a worker process:\n{1}'
+        raise ImportError(msg.format(modname, error))
+    return interfaces
+
+
+def load_process_module(modname):
+    """Return a module containing the mock device classes
+    built from the interfaces extracted in a worker process."""
+    from .interface import build_class
+    module = ModuleType(str(modname))
+    module.__file__ = find_source_file(modname)
+    for name, interface in load_process_interfaces(modname).items():
+        setattr(module, name, build_class(interface))
+    return module
+
+
+# Loaded import
+def import_loaded_object(documenter):
+    """Set the module, parent and object of a documenter
+    from a module loaded by the static or isolated loader."""
+    try:
+        module = load_module(documenter.env, documenter.modname)
+        parent, obj = None, module
+        for part in documenter.objpath:
+            parent, obj = obj, getattr(obj, part)
+    except Exception as exc:
+        msg = 'devicedoc: failed to load {0} {1!r}: {2}'
+        documenter.directive.warn(
+            msg.format(documenter.objtype, documenter.fullname, exc))
+        return False
+    seed_analyzer(documenter.modname, module.__file__)
+    documenter.module = module
+    documenter.parent = parent
+    documenter.object = obj
+    documenter.object_name = documenter.objpath[-1]
+    return True
+
+
+# Interface index
+DEVICE_CLASSES = {}
+
+
+def warn_missing_dump_object(documenter):
+    """Warn about an object missing from the dump file of its module.
+    Return False if the module is not documented from a dump file,
+    since it can be imported then."""
+    filename = get_dump_file(documenter.env, documenter.modname)
+    if not filename:
+        return False
+    msg = 'devicedoc: failed to load {0} {1!r}: not found in {2}'
+    documenter.directive.warn(
+        msg.format(documenter.objtype, documenter.fullname, filename))
+    return True
+
+
+def get_interface_cache(env):
+    """Return the persistent interface cache, if enabled."""
+    directory = env.config.devicedoc_cache_dir
+    if not directory:
+        return None
+    from .cache import InterfaceCache
+    return InterfaceCache(os.path.join(env.srcdir, directory))
+
+
+def get_dump_file(env, modname):
+    """Return the dump file of a virtual module, if any."""
+    filename = env.config.devicedoc_dump_files.get(modname)
+    return filename and os.path.join(env.srcdir, filename)
+
+
+def get_depends(modname, interfaces):
+    """Return the other modules defining members of the interfaces."""
+    return sorted(set(depend for interface in interfaces.values()
+                      for depend in interface.depends
+                      if depend != modname))
+
+
+def get_depends_stamp(modname, interfaces):
+    """Return the modification times of the source files of the other
+    modules the interfaces depend on."""
+    return tuple((depend, get_mtime(find_source_file(depend)))
+                 for depend in get_depends(modname, interfaces))
+
+
+def is_indexed(env, modname):
+    """Check whether the interfaces of a module are up to date
+    in the build environment."""
+    index = get_env_data(env, 'devicedoc_interfaces')
+    if modname not in index:
+        return False
+    filename = get_dump_file(env, modname) or find_source_file(modname)
+    mtime = get_mtime(filename)
+    stamp, _, interfaces = index[modname]
+    return mtime is not None and \
+        stamp == (mtime, get_depends_stamp(modname, interfaces))
+
+
+def prefetch_process_modules(env, modnames):
+    """Extract concurrently the modules the process loader is about to
+    load, so the timeouts of the failing modules overlap. The modules
+    served from a dump file, the index or the cache are skipped."""
+    from .cache import get_cache_key
+    if env.config.devicedoc_loader != 'process':
+        return
+    cache, pending = get_interface_cache(env), []
+    for modname in modnames:
+        if get_dump_file(env, modname) or is_indexed(env, modname):
+            continue
+        filename = find_source_file(modname)
+        if cache is not None and filename and cache.load(
+                modname, get_cache_key(filename, 'process')) is not None:
+            continue
+        pending.append(modname)
+    extract_process_modules(pending)
+
+
+def load_interfaces(env, modname):
+    """Return the source file of a module and the interfaces of its
+    device classes, loading the module only if its source or the source
+    of its base classes changed since the interfaces were stored in the
+    build environment or in the persistent cache."""
+    from .cache import get_cache_key
+    from .interface import extract_module, diff_interfaces
+    dumpfile = get_dump_file(env, modname)
+    filename = dumpfile or find_source_file(modname)
+    stamp = get_mtime(filename)
+    index = get_env_data(env, 'devicedoc_interfaces')
+    if is_indexed(env, modname):
+        return index[modname][1:]
+    # Dump file
+    if dumpfile:
+        from .dump import load_dump
+        with STATISTICS.module_timer(modname):
+            interfaces = load_dump(dumpfile, modname)
+        if modname in index:
+            note_changes(env, diff_interfaces(index[modname][2], interfaces))
+        index[modname] = (stamp, ()), filename, interfaces
+        return filename, interfaces
+    # Persistent cache
+    cache, key, interfaces = get_interface_cache(env), None, None
+    if cache is not None and filename:
+        key = get_cache_key(filename, env.config.devicedoc_loader)
+        interfaces = cache.load(modname, key)
+        if interfaces is not None:
+            saved = get_mtime(cache.get_path(modname))
+            for _, depend in get_depends_stamp(modname, interfaces):
+                if depend is None or depend > saved:
+                    interfaces = None
+                    break
+        STATISTICS.count('cache misses' if interfaces is None else
+                         'cache hits')
+    cached = interfaces is not None
+    # Extract in a worker process
+    if interfaces is None and env.config.devicedoc_loader == 'process':
+        interfaces = load_process_interfaces(modname)
+    # Load the module
+    if interfaces is None:
+        module = load_module(env, modname)
+        filename = filename or get_source_file(module)
+        interfaces = extract_module(module)
+    if not cached:
+        note_comments(modname, filename, interfaces)
+        if key is not None:
+            cache.save(modname, key, interfaces)
+    stamp = stamp, get_depends_stamp(modname, interfaces)
+    if modname in index:
+        note_changes(env, diff_interfaces(index[modname][2], interfaces))
+    index[modname] = stamp, filename, interfaces
+    return filename, interfaces
+
+
+def release_device_classes(app, doctree):
+    """Release the mock device classes once a document is read."""
+    DEVICE_CLASSES.clear()
+
+
+def get_device_class(interface):
+    """Return the mock device class built from an interface."""
+    key = interface.module, interface.name
+    if key not in DEVICE_CLASSES or DEVICE_CLASSES[key][0] is not interface:
+        from .interface import build_class
+        DEVICE_CLASSES[key] = interface, build_class(interface)
+    return DEVICE_CLASSES[key][1]
+
+
+def import_interface(documenter, name):
+    """Set the documenter object to the device class given by name,
+    served from the interface index. Return the interface of the
+    class, or None if the class is not indexed."""
+    try:
+        filename, interfaces = load_interfaces(documenter.env,
+                                               documenter.modname)
+    except Exception as exc:
+        msg = 'devicedoc: failed to index module {0!r}: {1}'
+        documenter.directive.warn(msg.format(documenter.modname, exc))
+        return None
+    interface = interfaces.get(name)
+    if interface is None:
+        return None
+    if filename and filename.endswith('.py'):
+        seed_analyzer(documenter.modname, filename)
+    note_device(documenter.env, interface)
+    documenter.module = None
+    documenter.parent = None
+    documenter.object = get_device_class(interface)
+    documenter.object_name = name
+    return interface
+
+
+# Documenter registry
+MOCK_DOCUMENTERS = {}
+
+
+def register_documenter(documenter):
+    """Register a tango item documenter for its mock types."""
+    for mocktype in documenter.types:
+        MOCK_DOCUMENTERS[mocktype] = documenter
+
+
+def get_mock_documenter(member):
+    """Return the documenter registered for the type of a member,
+    or None if it is not a tango mock. The subclasses of the mock
+    types are resolved once through their MRO."""
+    cls = type(member)
+    if cls not in MOCK_DOCUMENTERS:
+        MOCK_DOCUMENTERS[cls] = next(
+            (MOCK_DOCUMENTERS[base] for base in cls.__mro__[1:]
+             if MOCK_DOCUMENTERS.get(base) is not None), None)
+    return MOCK_DOCUMENTERS[cls]
+
+
+def is_device_candidate(member):
+    """Check whether a member might be a device class,
+    possibly created before PyTango got patched."""
+    return isinstance(member, type) and \
+        type(member).__name__ == DeviceMeta.__name__
+
+
 # Tango device documenter
 class TangoDeviceDocumenter(ClassDocumenter):
     """ Documenter for tango device classes."""
     objtype = 'tangodevice'
-    directivetype = 'class'
+    domain = 'tango'
+    directivetype = 'device'
     section = "{0} Device Documentation"
-    valid_types = (attribute, class_property, device_property, command)
+    option_spec = dict(ClassDocumenter.option_spec, sections=bool_option,
+                       summary=bool_option)
+    titles_allowed = True
     priority = ClassDocumenter.priority
     priority += 1
 
+    @timed
     def import_object(self):
-        reload(import_module(self.modname))
-        return ClassDocumenter.import_object(self)
+        """Load the device class from the interface index."""
+        self.interface = None
+        if len(self.objpath) == 1:
+            self.interface = import_interface(self, self.objpath[0])
+        if self.interface is not None:
+            self.doc_as_attr = False
+            return True
+        # Not indexed
+        if warn_missing_dump_object(self):
+            return False
+        if self.env.config.devicedoc_loader != 'import':
+            if not import_loaded_object(self):
+                return False
+            # Set by ClassDocumenter.import_object otherwise
+            self.doc_as_attr = self.objpath[-1] != self.object.__name__
+        else:
+            reload_module(self.modname)
+            if not ClassDocumenter.import_object(self):
+                return False
+        note_module(self.env, self.modname, get_source_file(self.module))
+        return True
 
     @classmethod
     def can_document_member(cls, member, membername, isattr, parent):
+        if isinstance(member, DeviceMeta):
+            return True
+        if not is_device_candidate(member):
+            return False
         member = reload_object(member)
         return isinstance(member, DeviceMeta)
 
+    @timed
+    @profiled
     def generate(self, more_content=None, real_modname=None,
                  check_module=False, all_members=False):
         """Patch to add a header."""
         # Get object
         if not self.parse_name() or not self.import_object():
             return
+        STATISTICS.count('documented ' + self.objtype)
+        all_members = all_members or bool(self.options.sections)
         # Add header
         if all_members:
             self.indent, temp = '', self.indent
@@ -151,23 +670,85 @@ class TangoDeviceDocumenter(ClassDocumenter):
             self.add_line("*" * len(section), '<autodoc>')
             self.indent = temp
         # Generate documentation
+        tracked = set(self.directive.filename_set)
         ClassDocumenter.generate(self, more_content, real_modname,
                                  check_module, all_members)
+        # Only rebuild on interface changes, see get_outdated
+        if self.interface is not None:
+            self.directive.filename_set &= tracked
+
+    def get_object_members(self, want_all):
+        """Serve the members from the device interface."""
+        if self.interface is None:
+            return ClassDocumenter.get_object_members(self, want_all)
+        inherited = bool(self.options.inherited_members)
+        names = [item.name for item in self.interface.get_items(inherited)]
+        if not want_all:
+            names = [name for name in names
+                     if name in (self.options.members or ())]
+        return False, sorted((name, getattr(self.object, name))
+                             for name in names)
 
     def filter_members(self, members, want_all):
-        """Filter to keep only objects of valid types."""
-        filt = lambda arg: isinstance(arg[1], self.valid_types)
-        filtered_members = filter(filt, members)
-        return [(name, member, True) for name, member in filtered_members]
+        """Filter to keep only tango objects."""
+        return [(name, member, True) for name, member in members
+                if get_mock_documenter(member) is not None]
 
     def document_members(self, all_members=False):
         """Prepare environment for automatic device documentation"""
         if all_members:
             self.options.member_order = 'groupwise'
-            self.env.config.autodevice = True
-            TangoItemDocumenter.reset()
+            start_device(self.env)
+        if self.options.summary and self.interface is not None:
+            return self.document_summary(all_members)
         ClassDocumenter.document_members(self, all_members)
 
+    def document_summary(self, all_members=False):
+        """Document each section as a single table, followed by the
+        description of the items having a docstring or a documentation
+        comment."""
+        from .interface import SECTIONS, render_summary
+        self.env.temp_data['autodoc:module'] = self.modname
+        self.env.temp_data['autodoc:class'] = self.objpath[0]
+        want_all = all_members or self.options.inherited_members or \
+            self.options.members is ALL
+        _, members = self.get_object_members(want_all)
+        names = set(name for name, _ in members
+                    if name not in (self.options.exclude_members or ()))
+        items = [item for item in self.interface.items if item.name in names]
+        attr_docs = self.analyzer.find_attr_docs() if self.analyzer else {}
+        for kind, section in SECTIONS:
+            section_items = sorted((item for item in items
+                                    if item.kind == kind),
+                                   key=lambda item: item.name)
+            if not section_items:
+                continue
+            STATISTICS.count('summarized ' + kind, len(section_items))
+            # Add header
+            if start_section(self.env, kind):
+                self.indent, temp = '', self.indent
+                self.add_line(section, '<autodoc>')
+                self.add_line("-" * len(section), '<autodoc>')
+                self.add_line('', '<autodoc>')
+                self.indent = temp
+            # Add table
+            detailed = [item.name for item in section_items if item.doc or
+                        (self.objpath[0], item.name) in attr_docs]
+            for line in render_summary(self.interface, section_items,
+                                       detailed):
+                self.add_line(line, '<autodoc>')
+            # Add details
+            for name in detailed:
+                member = getattr(self.object, name)
+                fullname = self.modname + '::' + \
+                    '.'.join(self.objpath + [name])
+                documenter = get_mock_documenter(member)(
+                    self.directive, fullname, self.indent)
+                documenter.generate(all_members=True,
+                                    real_modname=self.real_modname)
+        self.env.temp_data['autodoc:module'] = None
+        self.env.temp_data['autodoc:class'] = None
+
 
 # Tango item documenter
 class TangoItemDocumenter(ClassLevelDocumenter):
@@ -175,60 +756,101 @@ class TangoItemDocumenter(ClassLevelDocumenter):
     (device properties, attirbutes and commands).
     """
     objtype = 'tangoitem'
-    directivetype = 'attribute'
+    domain = 'tango'
     member_order = -1
     types = [class_property, device_property, attribute, command]
     priority = AttributeDocumenter.priority + 1
-    started = defaultdict(bool)
 
-    @classmethod
-    def can_document_member(cls, member, membername, isattr, parent):
-        return any(isinstance(member, mocktype) for mocktype in cls.types)
+    @property
+    def directivetype(self):
+        """Use the directive of the documenter registered for the object."""
+        return get_mock_documenter(self.object).directivetype
 
     @classmethod
-    def reset(cls):
-        cls.started.clear()
+    def can_document_member(cls, member, membername, isattr, parent):
+        documenter = get_mock_documenter(member)
+        return documenter is not None and issubclass(documenter, cls)
 
+    @timed
     def import_object(self):
         """Load an object."""
+        self.item = None
+        # Get the object from the interface index
+        if len(self.objpath) == 2:
+            interface = import_interface(self, self.objpath[0])
+            name = self.objpath[1]
+            if interface is not None and interface.get(name):
+                self.parent = self.object
+                self.object = getattr(self.parent, name)
+                self.object_name = name
+                self.item = interface.get(name)
+                return True
+        if warn_missing_dump_object(self):
+            return False
+        # Parse or execute the module
+        if self.env.config.devicedoc_loader != 'import':
+            if not import_loaded_object(self):
+                return False
+            note_module(self.env, self.modname, self.module.__file__)
+            return True
         # Get the object
         if not ClassLevelDocumenter.import_object(self):
             return False
         # Reload modules
         self.parent = reload_object(self.parent)
-        reload(import_module(self.modname))
+        reload_module(self.modname)
         # Get the new object
-        return ClassLevelDocumenter.import_object(self)
+        if not ClassLevelDocumenter.import_object(self):
+            return False
+        note_module(self.env, self.modname, get_source_file(self.module))
+        return True
 
+    @timed
+    @profiled
     def generate(self, more_content=None, real_modname=None,
                  check_module=False, all_members=False):
         """Patch to add a header."""
         # Get object
         if not self.parse_name() or not self.import_object():
             return
+        STATISTICS.count('documented ' + self.objtype)
         # Check if header needed
-        tangotype = type(self.object)
-        autodevice = getattr(self.env.config, 'autodevice', False)
-        if autodevice and not self.started[tangotype]:
-            # Tag as started
-            self.started[tangotype] = True
+        tangotype = type(self.object).__name__
+        if start_section(self.env, tangotype):
             self.indent, temp = '', self.indent
             # Add header
             self.add_line(self.section, '<autodoc>')
             self.add_line("-" * len(self.section), '<autodoc>')
             self.indent = temp
         # Generate documentation
+        tracked = set(self.directive.filename_set)
         ClassLevelDocumenter.generate(self, more_content, real_modname,
                                       check_module, all_members)
+        # Only rebuild on interface changes, see get_outdated
+        if self.item is not None:
+            self.directive.filename_set &= tracked
+
+    def document_members(self, all_members=False):
+        """Tango items have no members to document, whatever the
+        member options given to the device."""
 
     def get_doc(self, encoding=None, ignore=1):
         """Patch to get the docs from the mock object."""
         NL = '\n'
         MU = ' |'
-        obj_repr = repr(self.object).replace(NL, NL+MU) + NL
+        lines = self.object.get_lines()
+        obj_repr = lines[:1] + [MU + line for line in lines[1:]] + ['']
         obj_doc = self.object.get_doc(encoding) + NL
-        return [obj_repr.split(NL), obj_doc.split(NL)]
-
+        docstrings = [obj_repr, obj_doc.split(NL)]
+        # Add the origin of inherited items
+        item = self.item
+        if self.env.config.devicedoc_show_origin and item is not None \
+           and item.origin != self.objpath[0]:
+            docstrings.insert(1, ["Defined in ``{0}``.".format(item.origin),
+                                  ''])
+        return docstrings
+
+    @timed
     def add_content(self, more_content, no_docstring=False):
         """Patch to add the documentation from the mock object
         before any other documentation."""
@@ -243,6 +865,7 @@ class TangoItemDocumenter(ClassLevelDocumenter):
 class TangoClassPropertyDocumenter(TangoItemDocumenter):
     priority = TangoItemDocumenter.priority + 1
     objtype = 'tangoclassproperty'
+    directivetype = 'classproperty'
     section = "Class properties"
     types = [class_property]
     member_order = 60
@@ -252,6 +875,7 @@ class TangoClassPropertyDocumenter(TangoItemDocumenter):
 class TangoPropertyDocumenter(TangoItemDocumenter):
     priority = TangoItemDocumenter.priority + 1
     objtype = 'tangoproperty'
+    directivetype = 'property'
     section = "Device properties"
     types = [device_property]
     member_order = 70
@@ -261,6 +885,7 @@ class TangoPropertyDocumenter(TangoItemDocumenter):
 class TangoAttributeDocumenter(TangoItemDocumenter):
     priority = TangoItemDocumenter.priority + 1
     objtype = 'tangoattribute'
+    directivetype = 'attribute'
     section = "Attributes"
     types = [attribute]
     member_order = 80
@@ -270,20 +895,106 @@ class TangoAttributeDocumenter(TangoItemDocumenter):
 class TangoCommandDocumenter(TangoItemDocumenter):
     priority = TangoItemDocumenter.priority + 1
     objtype = 'tangocommand'
+    directivetype = 'command'
     section = "Commands"
     types = [command]
     member_order = 90
 
 
+# Register the item documenters, most specific last
+for documenter in (TangoItemDocumenter, TangoClassPropertyDocumenter,
+                   TangoPropertyDocumenter, TangoAttributeDocumenter,
+                   TangoCommandDocumenter):
+    register_documenter(documenter)
+del documenter
+
+
+# Tango server directive
+class TangoServerDirective(Directive):
+    """Directive documenting all the device classes found
+    in the given packages or modules."""
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = True
+    has_content = False
+
+    def warn(self, msg):
+        return self.state.document.reporter.warning(msg, line=self.lineno)
+
+    def run(self):
+        from .static import discover_devices
+        env = self.state.document.settings.env
+        names = self.arguments[0].split()
+        dumps = [(name, []) for name in names if get_dump_file(env, name)]
+        names = [name for name in names if not get_dump_file(env, name)]
+        try:
+            modules = discover_devices(names)
+        except ImportError as exc:
+            return [self.warn('autotangoserver: {0}'.format(exc))]
+        modules = dumps + modules
+        prefetch_process_modules(env, [modname for modname, _ in modules])
+        result, warnings = ViewList(), []
+        for modname, classnames in modules:
+            try:
+                _, interfaces = load_interfaces(env, modname)
+            except Exception as exc:
+                msg = 'autotangoserver: failed to load module {0!r}: {1}'
+                warnings.append(self.warn(msg.format(modname, exc)))
+                continue
+            classnames = [name for name in classnames if name in interfaces]
+            classnames += sorted(set(interfaces) - set(classnames))
+            for name in classnames:
+                result.append('.. autotangodevice:: {0}.{1}'.format(
+                    modname, name), '<autotangoserver>')
+                result.append('    :sections:', '<autotangoserver>')
+                result.append('', '<autotangoserver>')
+        node = nodes.section()
+        node.document = self.state.document
+        nested_parse_with_titles(self.state, result, node)
+        return warnings + node.children
+
+
 # Setup the sphinx extension
 def setup(app):
     """Sphinx extension setup function."""
     if not isinstance(app, Sphinx):
         return
-    pytango_patch()
+    app.add_config_value('devicedoc_loader', 'import', 'env')
+    app.add_config_value('devicedoc_cache_dir', None, '')
+    app.add_config_value('devicedoc_dump_files', {}, 'env')
+    app.add_config_value('devicedoc_pytango_stub', False, 'env')
+    app.add_config_value('devicedoc_workers', None, '')
+    app.add_config_value('devicedoc_timeout', 60, '')
+    app.add_config_value('devicedoc_catalog', None, '')
+    app.add_config_value('devicedoc_show_origin', False, 'env')
+    app.add_config_value('devicedoc_changes_file', None, '')
+    app.add_config_value('devicedoc_stats', False, '')
+    app.add_config_value('devicedoc_stats_file', None, '')
+    app.add_config_value('devicedoc_profile', False, '')
+    app.add_config_value('devicedoc_profile_file', None, '')
+    app.connect('builder-inited', install_mocks)
+    app.connect('builder-inited', reset_reload_cache)
+    app.connect('builder-inited', init_statistics)
+    app.connect('builder-inited', init_profiler)
+    app.connect('builder-inited', init_changes)
+    app.connect('builder-inited', init_process_pool)
+    app.connect('build-finished', report_statistics)
+    app.connect('build-finished', report_profile)
+    app.connect('build-finished', write_catalog)
+    app.connect('build-finished', report_changes)
+    app.connect('build-finished', close_process_pool)
+    app.connect('env-get-outdated', get_outdated)
+    app.connect('env-purge-doc', purge_doc)
+    app.connect('env-merge-info', merge_info)
+    app.connect('doctree-read', release_device_classes)
+    app.add_domain(TangoDomain)
     app.add_autodocumenter(TangoDeviceDocumenter)
     app.add_autodocumenter(TangoAttributeDocumenter)
     app.add_autodocumenter(TangoPropertyDocumenter)
     app.add_autodocumenter(TangoClassPropertyDocumenter)
     app.add_autodocumenter(TangoCommandDocumenter)
     app.add_autodocumenter(TangoItemDocumenter)
+    app.add_directive('autotangoserver', TangoServerDirective)
+    return {'version': __version__,
+            'parallel_read_safe': True,
+            'parallel_write_safe': True}
@@ -0,0 +1,166 @@
+"""Tango domain for the devices and their properties, attributes
+and commands.
+
+The objects are stored in their own table, indexed by full name and by
+short name (``Device`` and ``Device.item``), so a cross-reference is
+resolved with a direct lookup. They are also written to the objects.inv
+inventory, so other projects can link to them through intersphinx.
+"""
+
+# Imports
+from sphinx import version_info
+from sphinx.domains import Domain, ObjType
+from sphinx.domains.python import PyClasslike, PyClassmember, PyXRefRole
+from sphinx.util.nodes import make_refnode
+
+
+# Index entries
+def make_index_entry(text, anchor):
+    """Return a single index entry, with the key column expected
+    since sphinx 1.4."""
+    if version_info < (1, 4):
+        return 'single', text, anchor, ''
+    return 'single', text, anchor, '', None
+
+
+# Object descriptions
+class TangoObject(object):
+    """Mixin registering the described object in the tango domain."""
+
+    def get_index_text(self, modname, name_cls):
+        name = name_cls[0]
+        if self.objtype == 'device':
+            return '{0} (Tango device in {1})'.format(name, modname)
+        clsname, _, itemname = name.rpartition('.')
+        label = self.env.get_domain('tango').object_types[self.objtype].lname
+        return '{0} (Tango {1} of {2})'.format(itemname, label, clsname)
+
+    def add_target_and_index(self, name_cls, sig, signode):
+        modname = self.options.get(
+            'module', self.env.temp_data.get('py:module'))
+        fullname = (modname and modname + '.' or '') + name_cls[0]
+        anchor = 'tango-' + fullname
+        # Note target
+        if anchor not in self.state.document.ids:
+            signode['names'].append(anchor)
+            signode['ids'].append(anchor)
+            signode['first'] = (not self.names)
+            self.state.document.note_explicit_target(signode)
+            domain = self.env.get_domain('tango')
+            objects = domain.data['objects']
+            if fullname in objects:
+                self.state_machine.reporter.warning(
+                    'duplicate Tango object description of {0}, other '
+                    'instance in {1}, use :noindex: for one of them'.format(
+                        fullname, self.env.doc2path(objects[fullname][0])),
+                    line=self.lineno)
+            domain.note_object(fullname, self.env.docname, self.objtype,
+                               name_cls[0])
+        # Add index entry
+        indextext = self.get_index_text(modname, name_cls)
+        if indextext:
+            self.indexnode['entries'].append(
+                make_index_entry(indextext, anchor))
+
+
+class TangoDevice(TangoObject, PyClasslike):
+    """Description of a tango device class."""
+
+
+class TangoItem(TangoObject, PyClassmember):
+    """Description of a tango property, attribute or command."""
+
+
+# Tango domain
+class TangoDomain(Domain):
+    """Tango domain."""
+    name = 'tango'
+    label = 'Tango'
+    object_types = {
+        'device': ObjType('device', 'dev', 'obj'),
+        'classproperty': ObjType('class property', 'prop', 'obj'),
+        'property': ObjType('device property', 'prop', 'obj'),
+        'attribute': ObjType('attribute', 'attr', 'obj'),
+        'command': ObjType('command', 'cmd', 'obj'),
+    }
+    directives = {
+        'device': TangoDevice,
+        'classproperty': TangoItem,
+        'property': TangoItem,
+        'attribute': TangoItem,
+        'command': TangoItem,
+    }
+    roles = {
+        'dev': PyXRefRole(),
+        'prop': PyXRefRole(),
+        'attr': PyXRefRole(),
+        'cmd': PyXRefRole(),
+        'obj': PyXRefRole(),
+    }
+    initial_data = {
+        'objects': {},  # fullname -> docname, objtype
+        'names': {},  # short name -> fullnames
+    }
+
+    def note_object(self, fullname, docname, objtype, shortname):
+        """Register an object in the object table and the name index."""
+        self.data['objects'][fullname] = docname, objtype
+        fullnames = self.data['names'].setdefault(shortname, [])
+        if fullname not in fullnames:
+            fullnames.append(fullname)
+
+    def clear_doc(self, docname):
+        objects, names = self.data['objects'], self.data['names']
+        for fullname, (fn, _) in list(objects.items()):
+            if fn == docname:
+                del objects[fullname]
+        for shortname, fullnames in list(names.items()):
+            fullnames[:] = [name for name in fullnames if name in objects]
+            if not fullnames:
+                del names[shortname]
+
+    def merge_domaindata(self, docnames, otherdata):
+        objects, names = self.data['objects'], self.data['names']
+        for fullname, (fn, objtype) in otherdata['objects'].items():
+            if fn in docnames:
+                objects[fullname] = fn, objtype
+        for shortname, fullnames in otherdata['names'].items():
+            mine = names.setdefault(shortname, [])
+            mine.extend(name for name in fullnames
+                        if name in objects and name not in mine)
+
+    def find_obj(self, modname, clsname, target, typ):
+        """Return the (fullname, (docname, objtype)) entries matching
+        a target, trying the current module and class first."""
+        objects = self.data['objects']
+        objtypes = self.objtypes_for_role(typ) or ()
+        candidates = [target]
+        if modname:
+            candidates.insert(0, modname + '.' + target)
+            if clsname:
+                candidates.insert(0, '.'.join((modname, clsname, target)))
+        for name in candidates:
+            if name in objects and objects[name][1] in objtypes:
+                return [(name, objects[name])]
+        return [(name, objects[name])
+                for name in self.data['names'].get(target, ())
+                if objects[name][1] in objtypes]
+
+    def resolve_xref(self, env, fromdocname, builder,
+                     typ, target, node, contnode):
+        matches = self.find_obj(node.get('py:module'), node.get('py:class'),
+                                target, typ)
+        if not matches:
+            return None
+        if len(matches) > 1:
+            env.warn_node(
+                'more than one target found for cross-reference {0!r}: {1}'
+                .format(target, ', '.join(name for name, _ in matches)),
+                node)
+        name, (docname, _) = matches[0]
+        return make_refnode(builder, fromdocname, docname, 'tango-' + name,
+                            contnode, name)
+
+    def get_objects(self):
+        for fullname, (docname, objtype) in self.data['objects'].items():
+            yield fullname, fullname, objtype, docname, 'tango-' + fullname, 1
@@ -0,0 +1,150 @@
+"""Device interfaces from Tango database or attribute-config dump files.
+
+A dump file uses the JSON Lines format, with one device class per line.
+It is parsed one line at a time, so the JSON document is never held in
+memory as a whole. The interfaces of all its device classes are kept in
+the build environment though, so the memory used by the build still
+grows with the size of the dump. Each line is an object of the
+following form::
+
+    {"class": "PowerSupply",
+     "doc": "A power supply device",
+     "class_properties": {"name": {"type": ..., "description": ...,
+                                   "default_value": ...}},
+     "device_properties": {"host": "localhost"},
+     "attributes": [<get_attribute_config fields>],
+     "commands": [<get_command_config fields>]}
+
+The properties are given either as a plain value (used as the default
+value) or as an object with the POGO-like fields above. The enumerated
+fields (data types and formats, property types, write types and display
+levels) are given either as names or as the codes exported by PyTango,
+which are converted to names.
+"""
+
+# Imports
+import json
+from .interface import TangoItem, TangoInterface
+from .stub import CmdArgType, AttrDataFormat, AttrWriteType, DispLevel
+
+# Tango defaults
+NOT_SPECIFIED = set(["", "Not specified", "No description", "No unit",
+                     "No standard unit", "No display unit", "Uninitialised"])
+STANDARD_ATTRIBUTES = set(["State", "Status"])
+STANDARD_COMMANDS = set(["Init", "State", "Status"])
+STRING_TYPES = (str, type(u''))
+
+# Field conversions
+ATTRIBUTE_FIELDS = [
+    ('data_type', 'dtype'), ('data_format', 'dformat'),
+    ('writable', 'access'), ('label', 'label'), ('unit', 'unit'),
+    ('format', 'format'), ('min_value', 'min_value'),
+    ('max_value', 'max_value'), ('min_alarm', 'min_alarm'),
+    ('max_alarm', 'max_alarm'), ('min_warning', 'min_warning'),
+    ('max_warning', 'max_warning'), ('max_dim_x', 'max_dim_x'),
+    ('max_dim_y', 'max_dim_y'), ('disp_level', 'display_level')]
+
+COMMAND_FIELDS = [
+    ('in_type', 'dtype_in'), ('out_type', 'dtype_out'),
+    ('in_type_desc', 'doc_in'), ('out_type_desc', 'doc_out'),
+    ('disp_level', 'display_level')]
+
+PROPERTY_FIELDS = [('type', 'dtype'), ('default_value', 'default_value')]
+
+ENUM_FIELDS = {'data_type': CmdArgType, 'data_format': AttrDataFormat,
+               'writable': AttrWriteType, 'disp_level': DispLevel,
+               'in_type': CmdArgType, 'out_type': CmdArgType,
+               'type': CmdArgType}
+
+
+# Conversion helpers
+def is_specified(value):
+    """Check whether a dumped value carries information."""
+    if value is None:
+        return False
+    if isinstance(value, STRING_TYPES):
+        return value not in NOT_SPECIFIED
+    return True
+
+
+def convert_enum(source, value):
+    """Convert the code of an enumerated field to the name of its value."""
+    enum = ENUM_FIELDS.get(source)
+    if enum is None:
+        return value
+    try:
+        return enum.values[value].name
+    except (KeyError, TypeError):
+        return value
+
+
+def convert_fields(data, fields):
+    """Convert the dumped fields to mock keyword arguments."""
+    kwargs = {}
+    for source, target in fields:
+        value = data.get(source)
+        if is_specified(value):
+            kwargs[target] = convert_enum(source, value)
+    return kwargs
+
+
+def convert_property(name, kind, data, origin):
+    """Make a tango item from a dumped property."""
+    if not isinstance(data, dict):
+        data = {'default_value': data}
+    kwargs = convert_fields(data, PROPERTY_FIELDS)
+    doc = data.get('description')
+    return TangoItem(name, kind, kwargs,
+                     doc if is_specified(doc) else '', origin)
+
+
+def convert_attribute(data, origin):
+    """Make a tango item from a dumped attribute configuration."""
+    alarms = data.get('alarms') or {}
+    kwargs = convert_fields(alarms, ATTRIBUTE_FIELDS)
+    kwargs.update(convert_fields(data, ATTRIBUTE_FIELDS))
+    doc = data.get('description')
+    return TangoItem(data['name'], 'attribute', kwargs,
+                     doc if is_specified(doc) else '', origin)
+
+
+def convert_command(data, origin):
+    """Make a tango item from a dumped command configuration."""
+    name = data.get('cmd_name') or data['name']
+    kwargs = convert_fields(data, COMMAND_FIELDS)
+    doc = data.get('doc') or data.get('description')
+    return TangoItem(name, 'command', kwargs,
+                     doc if is_specified(doc) else '', origin)
+
+
+def convert_device(data, modname):
+    """Make an interface from a dumped device class."""
+    items, origin = [], data['class']
+    for kind, key in (('class_property', 'class_properties'),
+                      ('device_property', 'device_properties')):
+        properties = data.get(key) or {}
+        items.extend(convert_property(name, kind, properties[name], origin)
+                     for name in sorted(properties))
+    items.extend(convert_attribute(attribute, origin)
+                 for attribute in data.get('attributes') or ()
+                 if attribute['name'] not in STANDARD_ATTRIBUTES)
+    items.extend(convert_command(command, origin)
+                 for command in data.get('commands') or ()
+                 if (command.get('cmd_name') or command['name'])
+                 not in STANDARD_COMMANDS)
+    return TangoInterface(modname, origin, data.get('doc'), items)
+
+
+# Dump loading
+def iter_dump(filename, modname):
+    """Generate the interfaces of a dump file, one line at a time."""
+    with open(filename) as dump:
+        for line in dump:
+            if line.strip():
+                yield convert_device(json.loads(line), modname)
+
+
+def load_dump(filename, modname):
+    """Return the interfaces of a dump file, as a dictionary."""
+    return dict((interface.name, interface)
+                for interface in iter_dump(filename, modname))
@@ -0,0 +1,348 @@
+"""Compact description of the tango interface of HLAPI device classes.
+
+An interface lists the properties, attributes and commands of a device
+class in declaration order, along with their keyword arguments and
+documentation. It only contains plain python values, so it can be
+stored in the build environment and rebuilt into mock objects.
+"""
+
+# Imports
+import json
+import hashlib
+from inspect import cleandoc
+from weakref import WeakKeyDictionary
+from collections import namedtuple
+from .mock import Device, DeviceMeta
+from .mock import class_property, device_property, attribute, command
+
+
+# Tango kinds
+KINDS = dict((mock.__name__, mock) for mock in
+             (class_property, device_property, attribute, command))
+TANGO_TYPES = tuple(KINDS.values())
+ROLES = {'class_property': 'prop', 'device_property': 'prop',
+         'attribute': 'attr', 'command': 'cmd'}
+DIRECTIVES = {'class_property': 'classproperty', 'device_property': 'property',
+              'attribute': 'attribute', 'command': 'command'}
+SECTIONS = [('class_property', "Class properties"),
+            ('device_property', "Device properties"),
+            ('attribute', "Attributes"),
+            ('command', "Commands")]
+
+# Scalar types
+SCALAR_TYPES = (type(None), bool, int, float, str)
+try:
+    SCALAR_TYPES += (long, unicode)
+except NameError:
+    pass
+
+
+# Normalization
+def normalize(value):
+    """Convert a keyword argument value to a plain python value,
+    using the same conversion as the mock representation."""
+    if type(value) in SCALAR_TYPES:
+        return value
+    try:
+        return value.__name__
+    except AttributeError:
+        return str(value)
+
+
+def normalize_kwargs(mock):
+    """Return the normalized keyword arguments of a mock object."""
+    return dict((key, normalize(value))
+                for key, value in mock.kwargs.items()
+                if key not in mock.hidden)
+
+
+# Tango item
+TangoItem = namedtuple('TangoItem', 'name kind kwargs doc origin')
+
+
+# Tango interface
+class TangoInterface(object):
+    """Description of the tango interface of a device class.
+
+    The items include the inherited ones, their origin being the name
+    of the class defining them. The depends attribute lists the modules
+    the interface has been extracted from. The comments attribute maps
+    the item names to the lines of their documentation comments (``#:``),
+    as found by the sphinx module analyzer.
+    """
+
+    def __init__(self, module, name, doc, items, depends=None,
+                 comments=None):
+        self.module = module
+        self.name = name
+        self.doc = doc
+        self.items = items
+        self.depends = depends or [module]
+        self.comments = comments or {}
+        self.index = dict((item.name, item) for item in items)
+
+    def __repr__(self):
+        return "<TangoInterface {0}.{1}>".format(self.module, self.name)
+
+    def get(self, name):
+        """Return the item corresponding to a name, if any."""
+        return self.index.get(name)
+
+    def get_items(self, inherited=True):
+        """Return the items, possibly excluding the inherited ones."""
+        if inherited:
+            return self.items
+        return [item for item in self.items if item.origin == self.name]
+
+    def fingerprint(self):
+        """Return a stable digest of the documented interface: the class
+        documentation and the kind, arguments, documentation, comments and
+        order of the items. Computed once."""
+        if getattr(self, '_fingerprint', None) is None:
+            data = [self.module, self.name, self.doc,
+                    [list(item) for item in self.items], self.comments]
+            dump = json.dumps(data, sort_keys=True).encode('utf-8')
+            self._fingerprint = hashlib.sha1(dump).hexdigest()
+        return self._fingerprint
+
+    def to_dict(self):
+        """Convert the interface to a serializable dictionary."""
+        return {'module': self.module,
+                'name': self.name,
+                'doc': self.doc,
+                'depends': self.depends,
+                'comments': self.comments,
+                'items': [dict(item._asdict()) for item in self.items]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Make an interface from a dictionary."""
+        items = [TangoItem(**dict(item, origin=item.get('origin',
+                                                        data['name'])))
+                 for item in data['items']]
+        return cls(data['module'], data['name'], data['doc'], items,
+                   data.get('depends'), data.get('comments'))
+
+
+# Extraction
+def get_device_classes(module):
+    """Return the device classes defined in a module."""
+    return [value for value in vars(module).values()
+            if isinstance(value, DeviceMeta) and
+            value.__module__ == module.__name__]
+
+
+def extract_item(name, mock, origin):
+    """Make a tango item from a mock object."""
+    doc = mock.func_doc or mock.kwargs.get('doc') or ''
+    return TangoItem(name, type(mock).__name__, normalize_kwargs(mock),
+                     doc, origin)
+
+
+# Member tables
+OWN_MEMBERS = WeakKeyDictionary()
+MEMBER_TABLES = WeakKeyDictionary()
+
+
+def get_own_members(cls):
+    """Return the tango members defined by a class itself, along with
+    the names of its other members. Memoized by class identity."""
+    if cls not in OWN_MEMBERS:
+        mocks, others = {}, []
+        for name, value in vars(cls).items():
+            if isinstance(value, TANGO_TYPES):
+                mocks[name] = value
+            else:
+                others.append(name)
+        OWN_MEMBERS[cls] = mocks, others
+    return OWN_MEMBERS[cls]
+
+
+def get_member_table(cls):
+    """Return the resolved {name: (mock, defining class)} table of the
+    tango members of a class, including the inherited ones. A member
+    overridden by a regular member in a subclass is hidden, following
+    the method resolution order. Memoized by class identity."""
+    if cls in MEMBER_TABLES:
+        return MEMBER_TABLES[cls]
+    if len(cls.__bases__) == 1 and cls.__bases__[0] is not object:
+        # Single inheritance: extend the table of the base
+        table = dict(get_member_table(cls.__bases__[0]))
+        bases = [cls]
+    else:
+        table = {}
+        bases = [base for base in reversed(cls.__mro__)
+                 if base is not object]
+    for base in bases:
+        mocks, others = get_own_members(base)
+        for name in others:
+            table.pop(name, None)
+        for name, mock in mocks.items():
+            table[name] = mock, base
+    MEMBER_TABLES[cls] = table
+    return table
+
+
+def get_origin(cls, base):
+    """Return the name of the class defining a member,
+    qualified with its module if needed."""
+    if base.__module__ == cls.__module__:
+        return base.__name__
+    return '{0}.{1}'.format(base.__module__, base.__name__)
+
+
+def extract_interface(cls):
+    """Make the interface of a device class in a single pass."""
+    table = get_member_table(cls)
+    mocks = sorted((mock.order, name, mock, base)
+                   for name, (mock, base) in table.items())
+    items = [extract_item(name, mock, get_origin(cls, base))
+             for _, name, mock, base in mocks]
+    depends = [cls.__module__]
+    for _, _, _, base in mocks:
+        if base.__module__ not in depends:
+            depends.append(base.__module__)
+    return TangoInterface(cls.__module__, cls.__name__, cls.__doc__,
+                          items, depends)
+
+
+def extract_module(module):
+    """Return the interfaces of the device classes defined in a module."""
+    return dict((cls.__name__, extract_interface(cls))
+                for cls in get_device_classes(module))
+
+
+# Comparison
+def diff_items(old, new):
+    """Return the names of the items added, removed and modified
+    between two versions of an interface."""
+    return {'added': [item.name for item in new.items
+                      if old.get(item.name) is None],
+            'removed': [item.name for item in old.items
+                        if new.get(item.name) is None],
+            'modified': [item.name for item in new.items
+                         if old.get(item.name) is not None and
+                         (old.get(item.name) != item or
+                          old.comments.get(item.name) !=
+                          new.comments.get(item.name))]}
+
+
+def diff_interfaces(old, new):
+    """Compare two dictionaries of interfaces and return the changes
+    of the devices whose fingerprint differs, sorted by key."""
+    changes = []
+    for key in sorted(set(old) | set(new)):
+        before, after = old.get(key), new.get(key)
+        if before is not None and after is not None and \
+           before.fingerprint() == after.fingerprint():
+            continue
+        interface = after or before
+        change = {'module': interface.module, 'name': interface.name}
+        if before is None:
+            change['status'] = 'added'
+        elif after is None:
+            change['status'] = 'removed'
+        else:
+            change['status'] = 'modified'
+            change.update(diff_items(before, after))
+        changes.append(change)
+    return changes
+
+
+def format_change(change):
+    """Return a one-line description of a device change."""
+    line = '{module}.{name} {status}'.format(**change)
+    details = ['{0}: {1}'.format(key, ', '.join(change[key]))
+               for key in ('added', 'removed', 'modified') if change.get(key)]
+    if details:
+        line += ' (' + '; '.join(details) + ')'
+    return line
+
+
+# Rebuilding
+def build_mock(item):
+    """Make a mock object from a tango item."""
+    mock = KINDS[item.kind](**item.kwargs)
+    mock.func_doc = item.doc
+    return mock
+
+
+def build_class(interface):
+    """Make a mock device class from an interface."""
+    namespace = {'__module__': interface.module, '__doc__': interface.doc}
+    for item in interface.items:
+        namespace[item.name] = build_mock(item)
+    return DeviceMeta(str(interface.name), (Device,), namespace)
+
+
+# Rendering
+def render_interface(interface):
+    """Generate the reST lines documenting an interface, with the same
+    layout as the automatic device documentation."""
+    title = "{0} Device Documentation".format(interface.name)
+    yield title
+    yield "*" * len(title)
+    yield ""
+    yield ".. tango:device:: {0}".format(interface.name)
+    yield "    :module: {0}".format(interface.module)
+    yield ""
+    for line in cleandoc(interface.doc or '').splitlines():
+        yield "    " + line if line else ""
+    yield ""
+    for kind, section in SECTIONS:
+        items = sorted((item for item in interface.items
+                        if item.kind == kind), key=lambda item: item.name)
+        if not items:
+            continue
+        yield section
+        yield "-" * len(section)
+        yield ""
+        for item in items:
+            yield ".. tango:{0}:: {1}.{2}".format(
+                DIRECTIVES[item.kind], interface.name, item.name)
+            yield "    :module: {0}".format(interface.module)
+            yield ""
+            lines = build_mock(item).get_lines()
+            yield "    " + lines[0]
+            for line in lines[1:]:
+                yield "     |" + line
+            yield ""
+            if item.origin != interface.name:
+                yield "    Defined in ``{0}``.".format(item.origin)
+                yield ""
+            for line in cleandoc(item.doc).splitlines():
+                yield "    " + line if line else ""
+            yield ""
+            for line in interface.comments.get(item.name, ()):
+                yield "    " + line if line else ""
+
+
+def get_summary(doc):
+    """Return the first line of a docstring."""
+    lines = cleandoc(doc or '').splitlines()
+    return lines[0] if lines else ''
+
+
+def render_summary(interface, items, detailed=()):
+    """Generate the reST lines of a table summarizing the given items.
+    The names of the detailed items link to their own description."""
+    yield ".. list-table::"
+    yield "    :header-rows: 1"
+    yield "    :widths: 20 50 30"
+    yield ""
+    yield "    * - Name"
+    yield "      - Properties"
+    yield "      - Description"
+    for item in items:
+        if item.name in detailed:
+            yield "    * - :tango:{0}:`{1} <{2}.{3}.{1}>`".format(
+                ROLES[item.kind], item.name, interface.module,
+                interface.name)
+        else:
+            yield "    * - ``{0}``".format(item.name)
+        fields = ", ".join("{0}: ``{1}``".format(key, value)
+                           for key, value in build_mock(item).fields)
+        yield "      - " + fields if fields else "      -"
+        summary = get_summary(item.doc)
+        yield "      - " + summary if summary else "      -"
+    yield ""
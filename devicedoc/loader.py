@@ -0,0 +1,125 @@
+"""Loading of the device modules.
+
+The device modules are either imported (and reloaded at most once per
+build or source change), parsed statically, or executed in a disposable
+module object. This module doesn't depend on sphinx, so the modules can
+also be loaded by the command-line extractor and its worker processes.
+"""
+
+# Imports
+import os
+import sys
+from types import ModuleType
+from importlib import import_module
+from .stats import STATISTICS
+
+
+# Reload cache
+RELOADED_MODULES = {}
+SOURCE_FILES = {}
+
+
+def get_source_file(module):
+    """Return the python source file of a module, if any."""
+    filename = getattr(module, '__file__', None)
+    if not filename:
+        return None
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    return filename
+
+
+def get_mtime(filename):
+    """Return the modification time of a file, or None."""
+    try:
+        return os.path.getmtime(filename)
+    except (TypeError, OSError):
+        return None
+
+
+def get_source_stamp(module):
+    """Return the modification time of the module source file."""
+    return get_mtime(get_source_file(module))
+
+
+def reload_module(modname):
+    """Import a module and reload it if it hasn't been reloaded
+    during the current build or if its source file changed since.
+    A module imported for the first time is not reloaded."""
+    if modname not in sys.modules:
+        with STATISTICS.module_timer(modname):
+            module = import_module(modname)
+        RELOADED_MODULES[modname] = get_source_stamp(module)
+        return module
+    module = import_module(modname)
+    stamp = get_source_stamp(module)
+    if modname not in RELOADED_MODULES or \
+       RELOADED_MODULES[modname] != stamp:
+        with STATISTICS.module_timer(modname):
+            module = reload(module)
+        RELOADED_MODULES[modname] = stamp
+    return module
+
+
+def load_isolated_module(modname):
+    """Execute the source of a module in a disposable module object.
+    The module is only registered in sys.modules during its execution,
+    so it is released along with its classes once its interfaces are
+    extracted, instead of piling up generations of reloaded classes."""
+    from .static import find_source
+    filename = find_source(modname)
+    with open(filename) as source:
+        code = compile(source.read(), filename, 'exec')
+    module = ModuleType(str(modname))
+    module.__file__ = filename
+    parent = str(modname.rpartition('.')[0])
+    if os.path.basename(filename) == '__init__.py':
+        module.__package__ = str(modname)
+        module.__path__ = [os.path.dirname(filename)]
+    else:
+        module.__package__ = parent or None
+    # Relative imports require the parent package
+    if parent:
+        import_module(parent)
+    previous = sys.modules.get(modname)
+    sys.modules[modname] = module
+    try:
+        exec(code, vars(module))
+    finally:
+        if previous is None:
+            sys.modules.pop(modname, None)
+        else:
+            sys.modules[modname] = previous
+    return module
+
+
+def reset_reload_cache(app=None):
+    """Forget about the modules reloaded during the previous build."""
+    RELOADED_MODULES.clear()
+    SOURCE_FILES.clear()
+
+
+def find_source_file(modname):
+    """Find the source file of a module without importing it.
+    The result is cached for the current build."""
+    if modname not in SOURCE_FILES:
+        from .static import find_source
+        try:
+            SOURCE_FILES[modname] = find_source(modname)
+        except ImportError:
+            SOURCE_FILES[modname] = None
+    return SOURCE_FILES[modname]
+
+
+# Module loading
+def load_device_module(modname, loader='import'):
+    """Load a device module using the given loader: 'import', 'static'
+    or 'isolated'."""
+    if loader == 'static':
+        from .static import load_static_module
+        with STATISTICS.module_timer(modname):
+            return load_static_module(modname)
+    if loader == 'isolated':
+        with STATISTICS.module_timer(modname):
+            return load_isolated_module(modname)
+    return reload_module(modname)
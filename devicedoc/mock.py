@@ -0,0 +1,145 @@
+"""Mocks of the PyTango high level server API.
+
+The mocks record the keyword arguments and documentation of the tango
+declarations instead of creating a device server. This module doesn't
+depend on sphinx, so the device classes can be introspected quickly.
+"""
+
+# Imports
+from itertools import count
+
+__all__ = ['BaseMock', 'class_property', 'device_property', 'attribute',
+           'command', 'DeviceMeta', 'Device', 'pytango_patch']
+
+
+# Helpers
+def force_decode(string, encoding):
+    """Get a unicode string out of a byte string,
+    as sphinx.util.force_decode does."""
+    if isinstance(string, bytes):
+        try:
+            string = string.decode(encoding or 'utf-8')
+        except UnicodeError:
+            string = string.decode('latin1')
+    return string
+
+
+# Mock
+def render_value(value):
+    """Render a keyword argument value for the documentation."""
+    if value == "":
+        value = "None"
+    try:
+        value = value.__name__
+    except AttributeError:
+        pass
+    return "{0}".format(value)
+
+
+class BaseMock(object):
+    """Mocking base class."""
+    __slots__ = ['kwargs', 'func_doc', 'order', '_fields', '_lines']
+    hidden = ["doc", "fget", "fset", "fisallowed"]
+    counter = count()
+
+    def __init__(self, func=None, **kwargs):
+        """Save kwargs, function documentation and declaration order."""
+        self.kwargs = kwargs
+        self.func_doc = func.__doc__ if func else None
+        self.order = next(self.counter)
+        self._fields = None
+        self._lines = None
+
+    def __call__(self, func):
+        """Decorator support."""
+        self.func_doc = func.__doc__
+        return self
+
+    def setter(self, func):
+        """Decorator support."""
+        return self
+
+    def deleter(self, func):
+        """Decorator support."""
+        return self
+
+    @property
+    def fields(self):
+        """Rendered keyword arguments as a sorted list of (key, value)
+        pairs, computed once."""
+        if self._fields is None:
+            self._fields = [(key, render_value(value))
+                            for key, value in sorted(self.kwargs.items())
+                            if key not in self.hidden]
+        return self._fields
+
+    def get_lines(self):
+        """Return the lines of the readable representation,
+        computed once."""
+        if self._lines is None:
+            # Add type
+            name = type(self).__name__.replace('_', ' ').capitalize()
+            # Add kwargs
+            args = ["    - {0} : {1}".format(key, value)
+                    for key, value in self.fields]
+            self._lines = [name + ':'] + args if args else [name + '.']
+        return self._lines
+
+    def __repr__(self):
+        """Generate a readable representation."""
+        return '\n'.join(self.get_lines())
+
+    def get_doc(self, encoding=None):
+        """Get the documentation from the object."""
+        doc = self.func_doc or self.kwargs.get('doc') or ''
+        return force_decode(doc, encoding)
+
+
+# Tango mock
+class class_property(BaseMock):
+    """Mock for class property."""
+    __slots__ = []
+
+
+class device_property(BaseMock):
+    """Mock for device property."""
+    __slots__ = []
+
+
+class attribute(BaseMock):
+    """Mock for TANGO attribute."""
+    __slots__ = []
+
+    def write(self, method):
+        pass
+
+
+class command(BaseMock):
+    """Mock for TANGO command."""
+    __slots__ = []
+    __tango_command__ = True
+    __name__ = "tango_command"
+
+
+class DeviceMeta(type):
+    """Mock for device metaclass."""
+    pass
+
+
+class Device(object):
+    """Mock for device class."""
+    __metaclass__ = DeviceMeta
+
+    def run_server(self, cls):
+        pass
+
+
+# Monkey patching
+def pytango_patch():
+    from PyTango import server
+    server.attribute = attribute
+    server.command = command
+    server.device_property = device_property
+    server.class_property = class_property
+    server.Device = Device
+    server.DeviceMeta = DeviceMeta
@@ -0,0 +1,145 @@
+"""Sharded extraction of the device interfaces.
+
+The device modules or classes are partitioned into shards using a stable
+hash of their names, so each shard can be extracted independently, e.g.
+on several CI runners, with ``devicedoc --shard 1/4 -f jsonl``. The
+shard files are then merged into a sphinx documentation source tree with
+one page per device, a combined index and a combined catalog.
+"""
+
+# Imports
+import os
+import sys
+import hashlib
+import argparse
+from .catalog import make_entry, load_catalog, write_catalog
+from .interface import render_interface
+
+# Partition keys
+SHARD_KEYS = ['module', 'class']
+
+
+# Partition
+def parse_shard(text):
+    """Parse a 'index/count' shard specification, index starting at 1."""
+    try:
+        index, count = [int(part) for part in text.split('/')]
+    except ValueError:
+        raise ValueError('invalid shard {0!r}, expected index/count'
+                         .format(text))
+    if not 1 <= index <= count:
+        raise ValueError('invalid shard {0!r}, index out of range'
+                         .format(text))
+    return index, count
+
+
+def get_shard(key, count):
+    """Return the shard of a module or class name, from 1 to count.
+    The partition is stable across processes and machines."""
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return int(digest, 16) % count + 1
+
+
+def in_shard(key, shard):
+    """Check whether a module or class name belongs to a shard."""
+    index, count = shard
+    return get_shard(key, count) == index
+
+
+def select_modules(modnames, shard, by='module'):
+    """Return the modules to extract for a shard. When partitioning by
+    class, the candidate classes are found by scanning the sources."""
+    from .static import find_source, scan_module
+    if by == 'module':
+        return [modname for modname in modnames if in_shard(modname, shard)]
+    selected = []
+    for modname in modnames:
+        try:
+            classnames = scan_module(find_source(modname))
+        except ImportError:
+            classnames = []
+        if not classnames or any(in_shard(modname + '.' + name, shard)
+                                 for name in classnames):
+            selected.append(modname)
+    return selected
+
+
+def select_interfaces(interfaces, shard, by='module'):
+    """Return the interfaces belonging to a shard."""
+    if by == 'module':
+        return [interface for interface in interfaces
+                if in_shard(interface.module, shard)]
+    return [interface for interface in interfaces
+            if in_shard(interface.module + '.' + interface.name, shard)]
+
+
+# Merge
+def merge_shards(filenames):
+    """Return the interfaces of several shard files, keyed by
+    (module, name). A device extracted differently by two shards
+    raises a ValueError."""
+    interfaces, origins = {}, {}
+    for filename in filenames:
+        for key, interface in load_catalog(filename).items():
+            other = interfaces.get(key)
+            if other is not None and \
+               other.fingerprint() != interface.fingerprint():
+                raise ValueError('{0}.{1} differs in {2} and {3}'.format(
+                    key[0], key[1], origins[key], filename))
+            interfaces[key], origins[key] = interface, filename
+    return interfaces
+
+
+def write_site(directory, interfaces, title="Device Documentation"):
+    """Write a sphinx source tree documenting the given interfaces:
+    one page per device, an index page and the combined catalog."""
+    devices = os.path.join(directory, 'devices')
+    if not os.path.isdir(devices):
+        os.makedirs(devices)
+    docnames = []
+    for key in sorted(interfaces):
+        docname = 'devices/{0}.{1}'.format(*key)
+        with open(os.path.join(directory, docname + '.rst'), 'w') as page:
+            for line in render_interface(interfaces[key]):
+                page.write(line + '\n')
+        docnames.append(docname)
+    with open(os.path.join(directory, 'index.rst'), 'w') as index:
+        index.write('{0}\n{1}\n\n'.format(title, '=' * len(title)))
+        index.write('.. toctree::\n    :maxdepth: 1\n\n')
+        for docname in docnames:
+            index.write('    {0}\n'.format(docname))
+        index.write('\n* :ref:`genindex`\n')
+    with open(os.path.join(directory, 'conf.py'), 'w') as conf:
+        conf.write("extensions = ['devicedoc']\n")
+        conf.write("devicedoc_pytango_stub = True\n")
+        conf.write("master_doc = 'index'\n")
+        conf.write("project = {0!r}\n".format(title))
+    entries = (make_entry(interfaces[key]) for key in sorted(interfaces))
+    return write_catalog(os.path.join(directory, 'catalog.jsonl'), entries)
+
+
+# Main
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='devicedoc-merge',
+        description='Merge device interface shards into a sphinx '
+                    'documentation source tree.')
+    parser.add_argument('shards', nargs='+', metavar='shard',
+                        help='shard file written by devicedoc -f jsonl')
+    parser.add_argument('-o', '--output', required=True,
+                        help='output directory')
+    parser.add_argument('-t', '--title', default="Device Documentation",
+                        help='title of the index page')
+    args = parser.parse_args(argv)
+    try:
+        interfaces = merge_shards(args.shards)
+    except (IOError, ValueError) as exc:
+        parser.error(str(exc))
+    count = write_site(args.output, interfaces, args.title)
+    sys.stderr.write('devicedoc: {0} devices written to {1}\n'
+                     .format(count, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Static extraction of HLAPI Tango Device classes.
+
+The device modules are parsed using the ast module instead of being
+imported, and the tango declarations are turned into the same mock
+objects as the ones used by the patched PyTango server module.
+"""
+
+# Imports
+import os
+import ast
+import imp
+from types import ModuleType
+from .mock import Device, DeviceMeta
+from .mock import class_property, device_property, attribute, command
+
+
+# Tango declarations
+MOCKS = dict((mock.__name__, mock) for mock in
+             (class_property, device_property, attribute, command))
+DECORATOR_METHODS = ['write', 'setter', 'deleter']
+
+# Parsed modules
+STATIC_MODULES = {}
+PARSED_MODULES = set()
+PYTANGO_MODULES = ['PyTango', 'tango']
+
+
+# Expression placeholder
+class Expression(object):
+    """Placeholder for a non-literal expression found in the source."""
+
+    def __init__(self, name):
+        self.__name__ = name
+
+    def __repr__(self):
+        return self.__name__
+
+    __str__ = __repr__
+
+
+# Source helpers
+def find_source(modname):
+    """Find the source file of a module without importing it."""
+    path, filename, kind = None, None, None
+    for part in modname.split('.'):
+        fileobj, filename, (_, _, kind) = imp.find_module(part, path)
+        if fileobj:
+            fileobj.close()
+        if kind == imp.PKG_DIRECTORY:
+            path = [filename]
+            filename = os.path.join(filename, '__init__.py')
+    if kind not in (imp.PY_SOURCE, imp.PKG_DIRECTORY):
+        raise ImportError('No python source for module {0}'.format(modname))
+    return filename
+
+
+def get_name(node):
+    """Return the last component of a (dotted) name node, if any."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def evaluate(node):
+    """Evaluate a node as a literal if possible,
+    or return a placeholder for the expression."""
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        pass
+    if isinstance(node, ast.Tuple):
+        return tuple(evaluate(elt) for elt in node.elts)
+    if isinstance(node, ast.List):
+        return [evaluate(elt) for elt in node.elts]
+    return Expression(get_name(node) or '...')
+
+
+# Mock helpers
+def get_mock_type(node):
+    """Return the mock type corresponding to a call or a decorator."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    return MOCKS.get(get_name(node))
+
+
+def make_mock(node, doc=None):
+    """Make a mock object from a tango declaration node."""
+    mocktype = get_mock_type(node)
+    kwargs = {}
+    if isinstance(node, ast.Call):
+        kwargs = dict((keyword.arg, evaluate(keyword.value))
+                      for keyword in node.keywords if keyword.arg)
+    mock = mocktype(**kwargs)
+    if doc:
+        mock.func_doc = doc
+    return mock
+
+
+def get_declarations(node):
+    """Generate the (name, mock) tango declarations of a class node.
+    A None mock means the name is overridden by a regular member."""
+    for stmt in node.body:
+        # Properties and attributes
+        if isinstance(stmt, ast.Assign):
+            names = [target.id for target in stmt.targets
+                     if isinstance(target, ast.Name)]
+            mock = None
+            if isinstance(stmt.value, ast.Call) and \
+               get_mock_type(stmt.value):
+                mock = make_mock(stmt.value)
+            for name in names:
+                yield name, mock
+        # Commands and decorated attributes
+        elif isinstance(stmt, ast.FunctionDef):
+            decorators = stmt.decorator_list
+            if any(isinstance(decorator, ast.Attribute) and
+                   decorator.attr in DECORATOR_METHODS
+                   for decorator in decorators):
+                continue
+            mock = None
+            for decorator in decorators:
+                if get_mock_type(decorator):
+                    mock = make_mock(decorator, ast.get_docstring(stmt))
+            yield stmt.name, mock
+
+
+# Device classes
+def is_device_class(node, devices):
+    """Check whether a class node declares a HLAPI device class."""
+    for base in node.bases:
+        if get_name(base) == Device.__name__ or get_name(base) in devices:
+            return True
+    for keyword in getattr(node, 'keywords', []):
+        if keyword.arg == 'metaclass' and \
+           get_name(keyword.value) == DeviceMeta.__name__:
+            return True
+    for stmt in node.body:
+        if isinstance(stmt, ast.Assign) and \
+           any(get_name(target) == '__metaclass__'
+               for target in stmt.targets) and \
+           get_name(stmt.value) == DeviceMeta.__name__:
+            return True
+    return False
+
+
+def make_device_class(node, modname, devices):
+    """Make a mock device class from a class node."""
+    bases = tuple(devices[get_name(base)] for base in node.bases
+                  if get_name(base) in devices) or (Device,)
+    namespace = {'__module__': modname, '__doc__': ast.get_docstring(node)}
+    for name, mock in get_declarations(node):
+        if mock is None:
+            namespace.pop(name, None)
+        else:
+            namespace[name] = mock
+    return DeviceMeta(str(node.name), bases, namespace)
+
+
+# Imported base classes
+def get_import_source(node, modname, filename):
+    """Return the absolute name of the module a from-import node
+    imports from, or None for a relative import of modules."""
+    if not node.level:
+        return node.module
+    package = modname
+    if os.path.basename(filename) != '__init__.py':
+        package = modname.rpartition('.')[0]
+    parts = package.split('.') if package else []
+    if node.level - 1 > len(parts):
+        return None
+    parts = parts[:len(parts) - node.level + 1]
+    if not node.module:
+        return None
+    return '.'.join(parts + [node.module])
+
+
+def get_imported_devices(tree, modname, filename):
+    """Return the device classes imported from other modules and used
+    as bases in a module tree, keyed by the name they are bound to,
+    along with the static modules they come from."""
+    bases = set(get_name(base) for node in tree.body
+                if isinstance(node, ast.ClassDef) for base in node.bases)
+    devices, depends = {}, []
+    for node in tree.body:
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        aliases = [alias for alias in node.names
+                   if (alias.asname or alias.name) in bases and
+                   alias.name != Device.__name__]
+        source = get_import_source(node, modname, filename)
+        if not aliases or not source or source in PARSED_MODULES or \
+           source.split('.')[0] in PYTANGO_MODULES:
+            continue
+        try:
+            module = load_static_module(source)
+        except (ImportError, IOError, SyntaxError):
+            continue
+        depends.append((source, module))
+        for alias in aliases:
+            cls = getattr(module, alias.name, None)
+            if cls is not None:
+                devices[alias.asname or alias.name] = cls
+    return devices, depends
+
+
+# Module loading
+def parse_module(modname, filename):
+    """Parse a device module and return a module object containing
+    its mock device classes, along with the static modules its
+    imported device bases come from."""
+    with open(filename) as source:
+        tree = ast.parse(source.read(), filename)
+    module = ModuleType(str(modname), ast.get_docstring(tree))
+    module.__file__ = filename
+    PARSED_MODULES.add(modname)
+    try:
+        imported, depends = get_imported_devices(tree, modname, filename)
+    finally:
+        PARSED_MODULES.discard(modname)
+    devices = dict(imported)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and is_device_class(node, devices):
+            devices[node.name] = make_device_class(node, modname, devices)
+            setattr(module, node.name, devices[node.name])
+    return module, depends
+
+
+def load_static_module(modname):
+    """Return the static module corresponding to a module name,
+    parsing its source only if it or the source of an imported
+    device base changed since the last call."""
+    filename = find_source(modname)
+    stamp = os.path.getmtime(filename)
+    if modname in STATIC_MODULES:
+        previous, module, depends = STATIC_MODULES[modname]
+        if previous == stamp and all(
+                load_static_module(depend) is cached
+                for depend, cached in depends):
+            return module
+    module, depends = parse_module(modname, filename)
+    STATIC_MODULES[modname] = stamp, module, depends
+    return module
+
+
+# Discovery
+def find_modules(name):
+    """Return the (modname, filename) pairs of a module,
+    or of all the modules of a package."""
+    filename = find_source(name)
+    if os.path.basename(filename) != '__init__.py':
+        return [(name, filename)]
+    modules = []
+    root = os.path.dirname(filename)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            dirname for dirname in dirnames
+            if os.path.isfile(os.path.join(dirpath, dirname, '__init__.py')))
+        parts = [name]
+        relative = os.path.relpath(dirpath, root)
+        if relative != os.curdir:
+            parts += relative.split(os.sep)
+        for filename in sorted(filenames):
+            base, ext = os.path.splitext(filename)
+            if ext != '.py':
+                continue
+            modname = '.'.join(parts if base == '__init__' else parts + [base])
+            modules.append((modname, os.path.join(dirpath, filename)))
+    return modules
+
+
+def has_bases(node):
+    """Check whether a class node has bases other than object."""
+    return any(get_name(base) != 'object' for base in node.bases)
+
+
+def scan_module(filename):
+    """Return the names of the classes of a source file that may
+    be device classes, in declaration order. Any subclass may be
+    a device class, since its bases may be imported device classes."""
+    try:
+        with open(filename) as source:
+            tree = ast.parse(source.read(), filename)
+    except (IOError, SyntaxError):
+        return []
+    devices = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if has_bases(node) or is_device_class(node, devices) or \
+           any(mock for _, mock in get_declarations(node)):
+            devices.append(node.name)
+    return devices
+
+
+def discover_devices(names):
+    """Return the (modname, classnames) pairs of the modules that may
+    declare device classes, scanning their source files."""
+    modules = []
+    for name in names:
+        modules.extend(find_modules(name))
+    results = [(modname, scan_module(path)) for modname, path in modules]
+    return [(modname, classnames) for modname, classnames in results
+            if classnames]
@@ -0,0 +1,323 @@
+"""Build-time statistics of the devicedoc extension.
+
+The statistics collect counters and timings during the build: modules
+loaded and their loading time, items documented per type, time spent
+in the documenter methods and peak memory of the building process.
+
+The optional profiler measures the wall time and the peak memory
+of the documenters and the device modules, aggregated per document, per
+device class and per module. The peak is traced with tracemalloc when
+its peak can be reset (python 3.9 and later), and is the growth of the
+peak resident memory of the process otherwise.
+"""
+
+# Imports
+import os
+import sys
+import json
+import time
+from functools import wraps
+from contextlib import contextmanager
+from collections import defaultdict
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Memory
+def get_peak_rss():
+    """Return the peak resident set size of the process in kilobytes,
+    or 0 if it is not available."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return peak
+
+
+# Statistics
+class Statistics(object):
+    """Counters and timings collected during a build."""
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """Clear all counters and timings."""
+        self.pid = os.getpid()
+        self.counters = defaultdict(int)
+        self.modules = defaultdict(float)
+        self.timings = defaultdict(float)
+        self.peak_rss = 0
+
+    def check_process(self):
+        """Start from scratch in a forked reading process."""
+        if self.pid != os.getpid():
+            self.reset()
+
+    def count(self, name, number=1):
+        """Increment a counter."""
+        if self.enabled:
+            self.check_process()
+            self.counters[name] += number
+
+    @contextmanager
+    def timer(self, name):
+        """Measure the time spent in a block."""
+        if not self.enabled:
+            yield
+            return
+        self.check_process()
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.time() - start
+
+    @contextmanager
+    def module_timer(self, modname):
+        """Measure the time spent loading a module, and profile it."""
+        with PROFILER.measure(lambda: [('modules', modname)]):
+            if not self.enabled:
+                yield
+                return
+            self.check_process()
+            start = time.time()
+            try:
+                yield
+            finally:
+                self.modules[modname] += time.time() - start
+                self.counters['modules loaded'] += 1
+                self.update_peak_rss()
+
+    def update_peak_rss(self):
+        """Record the peak memory of the process."""
+        self.peak_rss = max(self.peak_rss, get_peak_rss())
+
+    def merge(self, other):
+        """Add the statistics of another (parallel) process."""
+        for mine, theirs in ((self.counters, other.counters),
+                             (self.modules, other.modules),
+                             (self.timings, other.timings)):
+            for key, value in theirs.items():
+                mine[key] += value
+        self.peak_rss = max(self.peak_rss, other.peak_rss)
+
+    def to_dict(self):
+        """Convert the statistics to a serializable dictionary."""
+        return {'counters': dict(self.counters),
+                'modules': dict(self.modules),
+                'timings': dict(self.timings),
+                'peak_rss_kb': self.peak_rss}
+
+    def summary(self, slowest=5):
+        """Return the lines of a human readable summary."""
+        lines = ['devicedoc statistics:']
+        for name, value in sorted(self.counters.items()):
+            lines.append('  {0}: {1}'.format(name, value))
+        for name, value in sorted(self.timings.items()):
+            lines.append('  time in {0}: {1:.3f}s'.format(name, value))
+        if self.peak_rss:
+            lines.append('  peak memory: {0:.1f} MB'.format(
+                self.peak_rss / 1024.))
+        modules = sorted(self.modules.items(), key=lambda x: -x[1])
+        if modules:
+            lines.append('  slowest modules to load:')
+        for modname, value in modules[:slowest]:
+            lines.append('    {0}: {1:.3f}s'.format(modname, value))
+        return lines
+
+    def write(self, filename):
+        """Write the statistics to a JSON report file."""
+        with open(filename, 'w') as report:
+            json.dump(self.to_dict(), report, indent=2, sort_keys=True)
+
+
+# Global statistics
+STATISTICS = Statistics()
+
+
+# Profiler
+class Profiler(object):
+    """Wall time and peak memory, aggregated per document,
+    per device class and per module."""
+    groups = ['documents', 'devices', 'modules']
+
+    def __init__(self):
+        self.enabled = False
+        self.tracing = False
+        self.memory = None
+        self.reset()
+
+    def reset(self):
+        """Clear all measures."""
+        self.pid = os.getpid()
+        self.depth = 0
+        self.measures = dict((group, {}) for group in self.groups)
+        self.sites = []
+        self.peaks = []
+
+    def check_process(self):
+        """Start from scratch in a forked reading process."""
+        if self.pid != os.getpid():
+            self.reset()
+
+    def start(self):
+        """Start tracing the memory allocations, if possible. Return the
+        memory measure in use: 'tracemalloc', 'rss' or None."""
+        if tracemalloc is not None and hasattr(tracemalloc, 'reset_peak'):
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            self.memory = 'tracemalloc'
+        elif resource is not None:
+            self.memory = 'rss'
+        else:
+            self.memory = None
+        return self.memory
+
+    def stop(self):
+        """Record the main allocation sites and stop tracing."""
+        if tracemalloc is None or not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot()
+        self.sites = [{'filename': stat.traceback[0].filename,
+                       'size': stat.size, 'count': stat.count}
+                      for stat in snapshot.statistics('filename')[:20]]
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def is_tracing(self):
+        """Check whether the peak memory is traced by tracemalloc."""
+        return self.memory == 'tracemalloc' and tracemalloc.is_tracing()
+
+    def begin_peak(self):
+        """Start measuring the peak memory of a block and return its
+        baseline. The traced peak is reset, so the peak of the enclosing
+        blocks is kept aside."""
+        if self.memory == 'rss':
+            return get_peak_rss() * 1024
+        if not self.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        self.peaks.append(current)
+        tracemalloc.reset_peak()
+        return current
+
+    def end_peak(self, baseline):
+        """Return the peak memory of a block over its baseline."""
+        if self.memory == 'rss':
+            return max(get_peak_rss() * 1024 - baseline, 0)
+        if not self.is_tracing() or not self.peaks:
+            return 0
+        peak = max(self.peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        return peak - baseline
+
+    def add(self, group, name, elapsed, peak):
+        """Add a measure to an aggregate. The peaks of the calls are
+        summed, as the times are."""
+        measure = self.measures[group].setdefault(
+            name, {'calls': 0, 'time': 0., 'peak': 0})
+        measure['calls'] += 1
+        measure['time'] += elapsed
+        measure['peak'] += peak
+
+    @contextmanager
+    def measure(self, get_keys):
+        """Measure a block. The (group, name) keys the measure is added to
+        are returned by the get_keys function, called at the end."""
+        if not self.enabled:
+            yield
+            return
+        self.check_process()
+        self.depth += 1
+        start, baseline = time.time(), self.begin_peak()
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            elapsed = time.time() - start
+            peak = self.end_peak(baseline)
+            for group, name in get_keys():
+                self.add(group, name, elapsed, peak)
+
+    def merge(self, other):
+        """Add the measures of another (parallel) process."""
+        for group in self.groups:
+            for name, theirs in other.measures[group].items():
+                mine = self.measures[group].setdefault(
+                    name, {'calls': 0, 'time': 0., 'peak': 0})
+                for key, value in theirs.items():
+                    mine[key] += value
+
+    def to_dict(self):
+        """Convert the measures to a serializable dictionary."""
+        return dict(self.measures, sites=self.sites)
+
+    def summary(self, largest=5):
+        """Return the lines of a human readable summary."""
+        lines = ['devicedoc profile:']
+        for group in self.groups:
+            measures = sorted(self.measures[group].items(),
+                              key=lambda x: (-x[1]['peak'],
+                                             -x[1]['time']))
+            if measures:
+                lines.append('  largest {0}:'.format(group))
+            for name, measure in measures[:largest]:
+                lines.append('    {0}: {1:.1f} kB peak in {2:.3f}s'.format(
+                    name, measure['peak'] / 1024., measure['time']))
+        return lines
+
+    def write(self, filename):
+        """Write the measures to a JSON report file."""
+        with open(filename, 'w') as report:
+            json.dump(self.to_dict(), report, indent=2, sort_keys=True)
+
+
+# Global profiler
+PROFILER = Profiler()
+
+
+# Documenter timing
+def timed(method):
+    """Decorator measuring the time spent in a documenter method."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        name = '{0}.{1}'.format(self.objtype, method.__name__)
+        with STATISTICS.timer(name):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Documenter profiling
+def profiled(method):
+    """Decorator profiling a documenter generate method. The nested
+    documenters are accounted to the outermost one."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not PROFILER.enabled or PROFILER.depth:
+            return method(self, *args, **kwargs)
+
+        def get_keys():
+            objpath = getattr(self, 'objpath', None) or ['']
+            device = '{0}.{1}'.format(self.modname, objpath[0])
+            return [('documents', self.env.docname), ('devices', device)]
+
+        with PROFILER.measure(get_keys):
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,127 @@
+"""Lightweight PyTango stub for documentation builds.
+
+The stub provides the `PyTango` and `tango` packages along with their
+`server` module, so the device modules can be imported without the
+native Tango bindings. The server module contains the devicedoc mocks.
+"""
+
+# Imports
+import sys
+from types import ModuleType
+from .mock import Device, DeviceMeta
+from .mock import class_property, device_property, attribute, command
+
+
+# Enumerations
+class EnumValue(int):
+    """Named value of a stub enumeration."""
+
+    def __new__(cls, name, value):
+        self = int.__new__(cls, value)
+        self.name = name
+        return self
+
+    def __repr__(self):
+        return self.name
+
+    __str__ = __repr__
+
+
+def make_enum(name, *names):
+    """Make a stub enumeration class."""
+    values = [EnumValue(value, index) for index, value in enumerate(names)]
+    attrs = dict((value.name, value) for value in values)
+    attrs['names'] = dict(attrs)
+    attrs['values'] = dict((int(value), value) for value in values)
+    return type(name, (object,), attrs)
+
+
+AttrWriteType = make_enum(
+    'AttrWriteType',
+    'READ', 'READ_WITH_WRITE', 'WRITE', 'READ_WRITE', 'WT_UNKNOWN')
+
+AttrDataFormat = make_enum(
+    'AttrDataFormat',
+    'SCALAR', 'SPECTRUM', 'IMAGE', 'FMT_UNKNOWN')
+
+DispLevel = make_enum(
+    'DispLevel',
+    'OPERATOR', 'EXPERT', 'DL_UNKNOWN')
+
+AttrQuality = make_enum(
+    'AttrQuality',
+    'ATTR_VALID', 'ATTR_INVALID', 'ATTR_ALARM',
+    'ATTR_CHANGING', 'ATTR_WARNING')
+
+DevState = make_enum(
+    'DevState',
+    'ON', 'OFF', 'CLOSE', 'OPEN', 'INSERT', 'EXTRACT', 'MOVING',
+    'STANDBY', 'FAULT', 'INIT', 'RUNNING', 'ALARM', 'DISABLE', 'UNKNOWN')
+
+CmdArgType = make_enum(
+    'CmdArgType',
+    'DevVoid', 'DevBoolean', 'DevShort', 'DevLong', 'DevFloat',
+    'DevDouble', 'DevUShort', 'DevULong', 'DevString', 'DevVarCharArray',
+    'DevVarShortArray', 'DevVarLongArray', 'DevVarFloatArray',
+    'DevVarDoubleArray', 'DevVarUShortArray', 'DevVarULongArray',
+    'DevVarStringArray', 'DevVarLongStringArray', 'DevVarDoubleStringArray',
+    'DevState', 'ConstDevString', 'DevVarBooleanArray', 'DevUChar',
+    'DevLong64', 'DevULong64', 'DevVarLong64Array', 'DevVarULong64Array',
+    'DevInt', 'DevEncoded')
+
+GreenMode = make_enum(
+    'GreenMode',
+    'Synchronous', 'Futures', 'Gevent')
+
+ENUMS = [AttrWriteType, AttrDataFormat, DispLevel, AttrQuality,
+         DevState, CmdArgType, GreenMode]
+
+
+# Other stub objects
+class DevFailed(Exception):
+    """Stub for the tango exception."""
+
+
+class StubObject(object):
+    """Stub for the tango clients and utilities."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def run(*args, **kwargs):
+    """Stub for the server run functions."""
+
+
+# Stub modules
+def make_stub(name):
+    """Make a stub tango package and its server module."""
+    package = ModuleType(name, "Stub of the tango package.")
+    package.__path__ = []
+    package.__version__ = '0.0.0'
+    package.DevFailed = DevFailed
+    for value in CmdArgType.values.values():
+        setattr(package, value.name, value)
+    for cls in ENUMS:
+        setattr(package, cls.__name__, cls)
+    for stub in ('DeviceProxy', 'AttributeProxy', 'Database', 'Except',
+                 'Util', 'DeviceClass', 'LatestDeviceImpl'):
+        setattr(package, stub, type(stub, (StubObject,), {}))
+    server = ModuleType(name + '.server', "Stub of the tango server module.")
+    server.Device = Device
+    server.DeviceMeta = DeviceMeta
+    server.attribute = attribute
+    server.command = command
+    server.device_property = device_property
+    server.class_property = class_property
+    server.run = server.server_run = run
+    package.server = server
+    return package, server
+
+
+def install_stub():
+    """Install the PyTango and tango stubs in sys.modules."""
+    for name in ('PyTango', 'tango'):
+        package, server = make_stub(name)
+        sys.modules[name] = package
+        sys.modules[server.__name__] = server
@@ -0,0 +1,175 @@
+"""Watch mode rebuilding the documentation as the sources are edited.
+
+A single Sphinx application is kept alive between the builds, so the
+patched PyTango, the loaded device modules and the interface index stay
+warm. On save, only the changed modules are loaded again and only the
+pages whose device interface changed are rebuilt. The application is
+only created again when the configuration file changes.
+"""
+
+# Imports
+import os
+import sys
+import time
+import argparse
+from threading import Thread
+from sphinx.application import Sphinx
+from .loader import get_mtime, find_source_file
+from .devicedoc import get_env_data
+from .devicedoc import init_statistics, init_profiler, init_changes
+
+
+# Watched files
+def get_watched_files(app):
+    """Return the files the documentation depends on: configuration,
+    pages, their dependencies and the device modules."""
+    env = app.env
+    filenames = set([os.path.join(app.confdir, 'conf.py')])
+    filenames.update(env.doc2path(docname) for docname in env.found_docs)
+    for dependencies in env.dependencies.values():
+        filenames.update(os.path.join(env.srcdir, dependency)
+                         for dependency in dependencies)
+    for modules in get_env_data(env, 'devicedoc_modules').values():
+        filenames.update(modules.values())
+    index = get_env_data(env, 'devicedoc_interfaces')
+    for (_, depends), filename, _ in index.values():
+        filenames.add(filename)
+        filenames.update(find_source_file(depend) for depend, _ in depends)
+    filenames.discard(None)
+    return filenames
+
+
+def get_stamps(filenames):
+    """Return the modification times of the given files."""
+    return dict((filename, get_mtime(filename)) for filename in filenames)
+
+
+# Watcher
+class Watcher(object):
+    """Sphinx application rebuilding the documentation on changes."""
+
+    def __init__(self, srcdir, outdir, buildername='html',
+                 confoverrides=None, interval=0.2):
+        self.srcdir = os.path.abspath(srcdir)
+        self.outdir = os.path.abspath(outdir)
+        self.buildername = buildername
+        self.confoverrides = confoverrides
+        self.app = self.create_app()
+        self.interval = interval
+        self.stamps = {}
+
+    def create_app(self):
+        """Create the sphinx application, reading the configuration."""
+        doctreedir = os.path.join(self.outdir, '.doctrees')
+        return Sphinx(self.srcdir, self.srcdir, self.outdir, doctreedir,
+                      self.buildername, self.confoverrides)
+
+    def get_conf_file(self):
+        """Return the path of the configuration file."""
+        return os.path.join(self.app.confdir, 'conf.py')
+
+    def build(self):
+        """Build the outdated pages and return the elapsed time."""
+        start = time.time()
+        try:
+            self.app.build()
+        finally:
+            self.stamps = get_stamps(get_watched_files(self.app))
+        return time.time() - start
+
+    def get_changed_files(self):
+        """Return the watched files modified since the last build."""
+        return sorted(filename for filename, stamp in self.stamps.items()
+                      if get_mtime(filename) != stamp)
+
+    def rebuild(self, changed=()):
+        """Start a new build with a warm environment and module cache.
+        A new application reads the configuration if it changed."""
+        conffile = self.get_conf_file()
+        if conffile in changed:
+            try:
+                self.app = self.create_app()
+            except Exception:
+                self.stamps[conffile] = get_mtime(conffile)
+                raise
+        else:
+            init_statistics(self.app)
+            init_profiler(self.app)
+            init_changes(self.app)
+        return self.build()
+
+    def watch(self):
+        """Rebuild the documentation each time a watched file changes."""
+        self.app.info('devicedoc: built in {0:.2f}s, watching {1} files'
+                      .format(self.build(), len(self.stamps)))
+        while True:
+            time.sleep(self.interval)
+            changed = self.get_changed_files()
+            if not changed:
+                continue
+            self.app.info('devicedoc: {0} changed'.format(
+                ', '.join(os.path.relpath(name) for name in changed)))
+            try:
+                elapsed = self.rebuild(changed)
+            except Exception as exc:
+                self.app.warn('devicedoc: build failed: {0}'.format(exc))
+            else:
+                self.app.info('devicedoc: rebuilt in {0:.2f}s'
+                              .format(elapsed))
+
+
+# Server
+def serve(directory, port):
+    """Serve a directory over HTTP in a background thread."""
+    try:
+        from http.server import HTTPServer, SimpleHTTPRequestHandler
+    except ImportError:
+        from BaseHTTPServer import HTTPServer
+        from SimpleHTTPServer import SimpleHTTPRequestHandler
+
+    class Handler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            path = SimpleHTTPRequestHandler.translate_path(self, path)
+            return os.path.join(directory, os.path.relpath(path))
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('localhost', port), Handler)
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+# Main
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='devicedoc-watch', description=__doc__.splitlines()[0])
+    parser.add_argument('srcdir', help='documentation source directory')
+    parser.add_argument('outdir', help='output directory')
+    parser.add_argument('-b', '--builder', default='html',
+                        help='sphinx builder (default: html)')
+    parser.add_argument('-D', '--define', action='append', default=[],
+                        metavar='name=value',
+                        help='override a configuration value')
+    parser.add_argument('-i', '--interval', type=float, default=0.2,
+                        help='polling interval in seconds (default: 0.2)')
+    parser.add_argument('-s', '--serve', type=int, metavar='port',
+                        help='serve the output directory on this port')
+    args = parser.parse_args(argv)
+    overrides = dict(define.split('=', 1) for define in args.define)
+    watcher = Watcher(args.srcdir, args.outdir, args.builder, overrides,
+                      args.interval)
+    if args.serve:
+        serve(os.path.abspath(args.outdir), args.serve)
+        watcher.app.info('devicedoc: serving {0} on http://localhost:{1}/'
+                         .format(args.outdir, args.serve))
+    try:
+        watcher.watch()
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
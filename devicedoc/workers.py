@@ -0,0 +1,178 @@
+"""Extraction of device interfaces in a pool of worker processes.
+
+Each worker installs the mocks once, then loads the device modules it
+is given one at a time and sends back their interfaces as plain
+dictionaries. The timeout of a module starts when it is handed to a
+worker: a worker running late is killed and replaced, and a worker
+dying is reported right away. A slow or crashing module only costs its
+own timeout.
+"""
+
+# Imports
+import time
+import traceback
+from multiprocessing import Process, Pipe, cpu_count
+
+# Polling interval of the busy workers, in seconds
+POLL_INTERVAL = 0.01
+
+
+# Worker functions
+def init_worker(stub):
+    """Install the PyTango stub or patch the PyTango server module."""
+    from .mock import pytango_patch
+    from .loader import reset_reload_cache
+    if stub:
+        from .stub import install_stub
+        install_stub()
+    else:
+        pytango_patch()
+    reset_reload_cache()
+
+
+def extract_worker(modname, loader):
+    """Return the interfaces of a module as dictionaries,
+    along with the formatted traceback if the extraction failed."""
+    from .loader import load_device_module
+    from .interface import extract_module
+    try:
+        module = load_device_module(modname, loader)
+        interfaces = extract_module(module)
+    except BaseException:
+        return None, traceback.format_exc()
+    return dict((name, interface.to_dict())
+                for name, interface in interfaces.items()), None
+
+
+def run_worker(connection, stub):
+    """Extract the modules received on a connection, one at a time,
+    until None is received. A failed initialization is reported as
+    the error of every module."""
+    try:
+        init_worker(stub)
+        error = None
+    except BaseException:
+        error = traceback.format_exc()
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        connection.send(extract_worker(*task) if error is None
+                        else (None, error))
+
+
+# Worker process
+class Worker(object):
+    """Worker process extracting one module at a time."""
+
+    def __init__(self, stub=False):
+        self.connection, child = Pipe()
+        self.process = Process(target=run_worker, args=(child, stub))
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        self.task = None
+        self.deadline = None
+
+    def submit(self, task, modname, loader, timeout=None):
+        """Start the extraction of a module, with its own deadline."""
+        self.task = task
+        self.deadline = None if timeout is None else time.time() + timeout
+        try:
+            self.connection.send((modname, loader))
+        except (IOError, OSError):
+            pass  # Reported as a dead worker by get_result
+
+    def get_result(self):
+        """Return the (interfaces, error) result of the current module,
+        or None if it is still running."""
+        try:
+            if self.connection.poll():
+                return self.connection.recv()
+            if self.process.is_alive():
+                return None
+        except (EOFError, IOError, OSError):
+            pass
+        self.stop()
+        msg = 'Worker process died with exit code {0}'
+        return None, msg.format(self.process.exitcode)
+
+    def stop(self):
+        """Terminate the worker process."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+# Extraction pool
+class ExtractionPool(object):
+    """Pool of processes extracting device interfaces."""
+
+    def __init__(self, workers=None, stub=False, loader='import',
+                 timeout=None):
+        self.workers = workers or cpu_count()
+        self.stub = stub
+        self.loader = loader
+        self.timeout = timeout
+        self.idle = []
+        self.busy = []
+
+    def dispatch(self, tasks):
+        """Hand the pending (task, modname) pairs to the idle workers,
+        starting new workers up to the size of the pool."""
+        while tasks and (self.idle or
+                         len(self.busy) < self.workers):
+            worker = self.idle.pop() if self.idle else Worker(self.stub)
+            task, modname = tasks.pop(0)
+            worker.submit(task, modname, self.loader, self.timeout)
+            self.busy.append(worker)
+
+    def collect(self):
+        """Return the (task, (interfaces, error)) pairs of the finished
+        modules. The workers past their deadline are killed, and the
+        dead workers are replaced on the next dispatch."""
+        results, now = [], time.time()
+        for worker in list(self.busy):
+            result = worker.get_result()
+            if result is None:
+                if worker.deadline is None or now < worker.deadline:
+                    continue
+                worker.stop()
+                result = None, 'Timeout after {0}s'.format(self.timeout)
+            self.busy.remove(worker)
+            if worker.process.is_alive():
+                self.idle.append(worker)
+            results.append((worker.task, result))
+        return results
+
+    def extract(self, modnames):
+        """Generate the (modname, interfaces, error) triplets of the given
+        modules, in order. The interfaces are dictionaries."""
+        modnames = list(modnames)
+        tasks = list(enumerate(modnames))
+        results = {}
+        for task, modname in enumerate(modnames):
+            while task not in results:
+                self.dispatch(tasks)
+                finished = self.collect()
+                if not finished:
+                    time.sleep(POLL_INTERVAL)
+                results.update(finished)
+            interfaces, error = results.pop(task)
+            yield modname, interfaces, error
+
+    def close(self):
+        """Terminate the workers, including the stuck ones."""
+        for worker in self.idle + self.busy:
+            worker.stop()
+        self.idle, self.busy = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
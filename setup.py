@@ -7,4 +7,9 @@ setup(name = "python-devicedoc",
       description = "Sphinx extension for Tango devices documentation.",
       packages = ['devicedoc'],
       include_package_data=True,
+      entry_points = {
+          'console_scripts': ['devicedoc = devicedoc.cli:main',
+                              'devicedoc-watch = devicedoc.watch:main',
+                              'devicedoc-merge = devicedoc.shard:main'],
+      },
      )